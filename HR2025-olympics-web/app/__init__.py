@@ -2,34 +2,85 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from .config import *
 from flask_migrate import Migrate
+from sqlalchemy import event
 import os
+import time
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 
-def create_app():
+def apply_sqlite_pragmas(engine, pragmas):
+    # Run the PRAGMAs on every new connection of a SQLite engine
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def create_app(config=None, env=None):
+    started = time.perf_counter()
+
     # Initialize the Flask app
     webapp = Flask(__name__)
 
-    # Configure the app (use your actual configuration here)
-    webapp.config['SQLALCHEMY_DATABASE_URI'] = SQLALCHEMY_DATABASE_URI  # Replace with your DB URI
-    webapp.config['SECRET_KEY'] = SECRET_KEY
+    # Settings for the environment (APP_ENV unless env is given)
+    webapp.config.from_object(get_config(env))
+
+    # Overrides, e.g. from the benchmark suite
+    if config:
+        webapp.config.update(config)
 
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = Credential_Path
 
     # Initialize the database with the app
     db.init_app(webapp)
+    with webapp.app_context():
+        apply_sqlite_pragmas(db.engine, webapp.config.get('SQLITE_PRAGMAS'))
+
+    # Rendered-page cache for the public routes, and the data versions it
+    # (like every in-process cache) is checked against
+    from .cache import page_cache, data_versions
+    page_cache.init_app(webapp)
+    data_versions.init_app(webapp)
+
+    # gzip / brotli of the responses, reusing compressed pages from the cache
+    from .compression import compressor
+    compressor.init_app(webapp)
+
+    # Request timing and SQL instrumentation (no-op unless enabled)
+    from .profiling import profiler
+    with webapp.app_context():
+        profiler.init_app(webapp, db.engine)
+
+    # {% cache %} template fragments and the Jinja bytecode cache
+    from . import fragments
+    fragments.init_app(webapp)
+
+    # Fingerprinted static assets (`flask build-assets`) and the asset_url() helper
+    from .assets import assets
+    assets.init_app(webapp)
+
+    # Server-Sent Events broker (stream lifetime and heartbeat)
+    from .live import live
+    live.init_app(webapp)
 
     # Register routes (Blueprints)
     from .routes import bp  # Import the blueprint
     webapp.register_blueprint(bp, url_prefix='/')  # You can set a different URL prefix if needed
 
 
-    from .models import Houses, Players
-    with webapp.app_context():
-        db.create_all()
-        Houses.create_default_houses()
-        Players.create_default_players()
+    # Seeding is done once with `flask bootstrap`, so startup writes nothing
+    from .commands import register_commands
+    register_commands(webapp)
+
+    # Found from any working directory, so `flask bootstrap` can upgrade
+    migrate = Migrate(webapp, db, directory=os.path.join(os.path.dirname(webapp.root_path), 'migrations'))
 
-    migrate = Migrate(webapp, db)
+    # Record how long startup took so slow boots show up in the logs
+    webapp.config['STARTUP_SECONDS'] = time.perf_counter() - started
+    webapp.logger.info("App created in %.3fs", webapp.config['STARTUP_SECONDS'])
 
     return webapp
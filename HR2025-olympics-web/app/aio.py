@@ -0,0 +1,346 @@
+"""
+Async read path for the spectator pages, served over ASGI.
+
+SpectatorApp is an ASGI application wrapped around the Flask app. GET
+requests for the read-only public routes (home, timetable, houses_status,
+match_view, autocomplete_players) are answered on the event loop: the page
+cache and conditional GETs are checked first, exactly as the Flask views do,
+and on a miss the data is loaded with an async SQLAlchemy engine (aiosqlite
+locally) while the worker stays free for other connections. Templates are
+rendered with the Flask app, through the same render_* helpers as the
+synchronous views.
+
+The live feeds (/live/...) are served on the event loop too: one LiveHub
+task per process polls the live_events table and hands new messages to the
+open streams, so an open spectator page costs no thread and no query of its
+own. Every other request, management included, goes to the Flask app
+unchanged over WSGI, each in a thread of its own and at most
+ASGI_WSGI_THREADS at a time.
+
+Needs the optional packages asgiref, aiosqlite (or aiomysql) and an ASGI
+server, e.g. `uvicorn asgi:application`.
+"""
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from flask import request, jsonify
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+
+from . import apply_sqlite_pragmas
+from .cache import data_versions, check_conditional, finish_conditional, cached_response, store_response
+from .compression import compressor
+from .live import live, event_channel, HOUSES_CHANNEL
+from .models import db, Players, Match_info
+from .routes import render_home, render_timetable, render_houses_status, render_match_view
+from .search import player_index
+from .utils import (
+    events_select, bracket_select, group_rounds, standings_select, standings_to_dicts,
+    timetable_days_select, day_counts, timetable_window_select, group_by_day, timetable_range,
+)
+
+# Async drivers for the sync database URLs
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'mysql': 'mysql+aiomysql',
+}
+
+# endpoint -> async view; filled in by @async_view below
+async_views = {}
+
+# endpoint -> channel of the live feed, from the view arguments
+live_feeds = {
+    'main.live_houses': lambda: HOUSES_CHANNEL,
+    'main.live_event': event_channel,
+}
+
+
+def async_view(endpoint):
+    def decorator(view):
+        async_views[endpoint] = view
+        return view
+    return decorator
+
+
+def async_url(url):
+    # The sync engine URL with its driver swapped for the async one
+    try:
+        return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+    except KeyError:
+        raise ValueError(f"No async driver configured for '{url.get_backend_name()}' databases")
+
+
+# Async views: load with the async session, return a response, or None to
+# let the synchronous Flask view handle the request instead
+
+@async_view('main.home')
+async def home(session):
+    return render_home((await session.scalars(events_select())).all())
+
+
+@async_view('main.timetable')
+async def timetable(session):
+    days = day_counts((await session.execute(timetable_days_select())).all())
+    hours = request.args.get('hours', type=int)
+    start, end, selected_day = timetable_range(days, request.args.get('day', ''), hours, datetime.now())
+    events = (await session.scalars(timetable_window_select(start, end))).all() if days else []
+    return render_timetable(days, selected_day, hours, group_by_day(events))
+
+
+@async_view('main.houses_status')
+async def houses_status(session):
+    standings = (await session.scalars(standings_select())).all()
+    if not standings:
+        return None  # not materialized yet; the sync view builds them
+    return render_houses_status(standings_to_dicts(standings))
+
+
+@async_view('main.match_view')
+async def match_view(session, match_id):
+    match_info = await session.get(Match_info, match_id)
+    if match_info is None:
+        return None
+    place_ids = [match_info.manual_1st_player_id, match_info.manual_2nd_player_id, match_info.manual_3rd_player_id]
+    players = {}
+    if any(place_ids):
+        players = {
+            player.id: player
+            for player in await session.scalars(db.select(Players).where(Players.id.in_([i for i in place_ids if i])))
+        }
+    rounds = group_rounds((await session.scalars(bracket_select(match_id))).all())
+    return render_match_view(match_info, [players.get(i) for i in place_ids], rounds)
+
+
+@async_view('main.autocomplete_players')
+async def autocomplete_players(session):
+    if not player_index.current:
+        player_index.build((await session.scalars(db.select(Players))).all(), data_versions.get('players')[0])
+    return jsonify(player_index.search(request.args.get('q', '').strip(), limit=5))
+
+
+class LiveHub:
+    """
+    The live feeds of one process on its event loop.
+
+    A single task polls the live_events table every LIVE_POLL_SECONDS while
+    any stream is open and puts each new message on the queues of that
+    channel's streams.
+    """
+
+    QUEUE_SIZE = 100
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self._subscribers = defaultdict(set)
+        self._after = None
+        self._task = None
+        self._starting = asyncio.Lock()
+
+    async def subscribe(self, channel):
+        q = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._subscribers[channel].add(q)
+        async with self._starting:
+            if self._task is None or self._task.done():
+                # Positioned before the caller replays, so nothing falls in between
+                async with self.sessions() as session:
+                    self._after = (await session.execute(live.last_id_select())).scalar()
+                self._task = asyncio.create_task(self._run())
+        return q
+
+    def unsubscribe(self, channel, q):
+        self._subscribers[channel].discard(q)
+        if not self._subscribers[channel]:
+            del self._subscribers[channel]
+
+    def subscribed(self, channel, q):
+        return q in self._subscribers.get(channel, ())
+
+    async def _run(self):
+        while self._subscribers:
+            await asyncio.sleep(live.poll)
+            try:
+                async with self.sessions() as session:
+                    entries = (await session.scalars(live.since_select(self._after))).all()
+            except Exception:
+                continue  # try again on the next poll
+            for entry in entries:
+                self._after = entry.id
+                message = (entry.id, live.format(entry))
+                for q in list(self._subscribers.get(entry.channel, ())):
+                    try:
+                        q.put_nowait(message)
+                    except asyncio.QueueFull:
+                        # The client stopped reading; its stream ends, the browser reconnects
+                        self.unsubscribe(entry.channel, q)
+
+
+class SpectatorApp:
+    """
+    ASGI entry point: async spectator reads, everything else via the Flask app.
+    """
+
+    def __init__(self, flask_app):
+        from asgiref.wsgi import WsgiToAsgi
+
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.wsgi_slots = asyncio.Semaphore(flask_app.config.get('ASGI_WSGI_THREADS', 64))
+        self.urls = flask_app.url_map.bind('localhost')
+
+        with flask_app.app_context():
+            url = flask_app.config.get('SQLALCHEMY_ASYNC_DATABASE_URI') or async_url(db.engine.url)
+        options = {} if str(url).startswith('sqlite') else dict(flask_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        self.engine = create_async_engine(url, **options)
+        apply_sqlite_pragmas(self.engine.sync_engine, flask_app.config.get('SQLITE_PRAGMAS'))
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.live_hub = LiveHub(self.sessions)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            try:
+                endpoint, view_args = self.urls.match(scope['path'], method='GET')
+            except HTTPException:
+                endpoint = None  # 404s and redirects are Flask's business
+            if endpoint in async_views:
+                response = await self._serve(scope, endpoint, view_args)
+                if response is not None:
+                    return await self._send(scope, send, response)
+            if endpoint in live_feeds and scope['method'] == 'GET':
+                return await self._live(scope, receive, send, live_feeds[endpoint](**view_args))
+
+        await self._wsgi(scope, receive, send)
+
+    async def _wsgi(self, scope, receive, send):
+        from asgiref.sync import ThreadSensitiveContext
+
+        # WsgiToAsgi runs the Flask app in the thread of the current
+        # ThreadSensitiveContext, a new one per request, rather than in the
+        # single thread shared by the whole process
+        async with self.wsgi_slots, ThreadSensitiveContext():
+            await self.wsgi(scope, receive, send)
+
+    async def _live(self, scope, receive, send, channel):
+        # Server-Sent Events stream of one channel, see LiveHub
+        headers = dict(scope['headers'])
+        last_event_id = headers.get(b'last-event-id', b'').decode('latin1') or None
+        q = await self.live_hub.subscribe(channel)
+        disconnected = asyncio.ensure_future(self._disconnected(receive))
+        try:
+            async with self.sessions() as session:
+                after = live.resume_from(last_event_id, (await session.execute(live.last_id_select())).scalar())
+                missed = (await session.scalars(live.since_select(after, channel))).all()
+
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream; charset=utf-8'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                ],
+            })
+            await self._send_chunk(send, "retry: 2000\n\n")
+            for entry in missed:
+                after = entry.id
+                await self._send_chunk(send, live.format(entry))
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + live.max_age
+            while not disconnected.done() and self.live_hub.subscribed(channel, q):
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break  # the client reconnects after the retry delay
+                message = asyncio.ensure_future(q.get())
+                await asyncio.wait({message, disconnected}, timeout=min(live.heartbeat, remaining),
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if not message.done():
+                    message.cancel()
+                    if not disconnected.done():
+                        await self._send_chunk(send, ": keep-alive\n\n")
+                    continue
+                event_id, chunk = message.result()
+                if event_id > after:  # already sent with the missed ones
+                    after = event_id
+                    await self._send_chunk(send, chunk)
+            if not disconnected.done():
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            self.live_hub.unsubscribe(channel, q)
+            disconnected.cancel()
+
+    @staticmethod
+    async def _disconnected(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    @staticmethod
+    async def _send_chunk(send, text):
+        await send({'type': 'http.response.body', 'body': text.encode(), 'more_body': True})
+
+    async def _serve(self, scope, endpoint, view_args):
+        with self.flask_app.request_context(self._environ(scope)):
+            view = self.flask_app.view_functions[endpoint]
+            scopes, vary = getattr(view, 'data_scopes', ()), getattr(view, 'data_vary', None)
+
+            async with self.sessions() as session:
+                # The request's snapshot of the shared data versions
+                data_versions.load((await session.execute(data_versions.select())).all())
+
+                etag, last_modified, not_modified = check_conditional(scopes, vary)
+                if not_modified is not None:
+                    return not_modified
+                if getattr(view, 'page_cached', False):
+                    hit = cached_response(etag)
+                    if hit is not None:
+                        return self._compress(finish_conditional(hit, etag, last_modified))
+
+                response = await async_views[endpoint](session, **view_args)
+            if response is None:
+                return None
+            if getattr(view, 'page_cached', False):
+                response = store_response(response, etag)
+            return self._compress(finish_conditional(response, etag, last_modified))
+
+    def _compress(self, response):
+        # The Flask after_request hooks do not run on this path
+        return compressor.compress(response) if compressor.enabled else response
+
+    @staticmethod
+    def _environ(scope):
+        headers = [(name.decode('latin1'), value.decode('latin1')) for name, value in scope['headers']]
+        host = next((value for name, value in headers if name.lower() == 'host'), 'localhost')
+        client = scope.get('client') or ('', 0)
+        return EnvironBuilder(
+            path=scope['path'],
+            base_url=f"{scope.get('scheme', 'http')}://{host}{scope.get('root_path', '')}",
+            query_string=scope['query_string'].decode('latin1'),
+            method=scope['method'],
+            headers=headers,
+            environ_overrides={'REMOTE_ADDR': client[0]},
+        ).get_environ()
+
+    @staticmethod
+    async def _send(scope, send, response):
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in response.headers.items()],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'' if scope['method'] == 'HEAD' else response.get_data(),
+        })
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
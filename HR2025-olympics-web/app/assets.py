@@ -0,0 +1,167 @@
+"""
+Static asset pipeline: fingerprinted file names, pre-compressed variants and
+resized images.
+
+`flask build-assets` copies the stylesheets under static/css/ and the
+images listed in IMAGES into static/dist/. Each output file gets a hash of
+its content in its name (base.3f2a9c1d.css) together with .gz and .br
+copies (brotli only when the package is installed), and the images are
+also resized to the widths listed (needs Pillow). static/dist/manifest.json
+maps the source names to the built files.
+
+Templates call asset_url('css/base.css') or asset_url('logo2.jpg', width=240).
+With a manifest the URL points at the fingerprinted file, which is served
+with a one-year immutable Cache-Control and the best pre-compressed variant
+the browser accepts; without one (e.g. during development) it falls back to
+the plain /static/ file.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from flask import request, send_file, url_for, abort
+from werkzeug.security import safe_join
+
+# Images to fingerprint, with the widths to produce besides the original
+IMAGES = {
+    'logo.jpg': [],
+    'logo2.jpg': [240, 960],
+}
+# Only text formats are worth compressing
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json'}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def _fingerprint(name, data):
+    root, ext = os.path.splitext(name)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+
+
+def _variant_key(name, width):
+    return f"{name}@{width}w" if width else name
+
+
+class Assets:
+    """
+    Resolves asset names to their fingerprinted URLs and serves the built files.
+    """
+
+    def __init__(self):
+        self.manifest = {}
+        self.dist_dir = None
+
+    def init_app(self, app):
+        self.dist_dir = os.path.join(app.static_folder, 'dist')
+        self.load_manifest()
+        app.add_url_rule('/static/dist/<path:filename>', 'asset', self.serve)
+        app.add_template_global(self.url, 'asset_url')
+
+    def load_manifest(self):
+        try:
+            with open(os.path.join(self.dist_dir, 'manifest.json')) as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            self.manifest = {}
+
+    def url(self, name, width=None):
+        built = self.manifest.get(_variant_key(name, width))
+        if built is None:
+            # Not built: the original file, unversioned
+            return url_for('static', filename=name)
+        return url_for('asset', filename=built)
+
+    def serve(self, filename):
+        path = safe_join(self.dist_dir, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+
+        mimetype = mimetypes.guess_type(filename)[0]
+        encoding = None
+        for name, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if request.accept_encodings[name] and os.path.isfile(path + suffix):
+                path, encoding = path + suffix, name
+                break
+
+        response = send_file(path, mimetype=mimetype, max_age=31536000)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+    def build(self, static_folder):
+        """
+        Build static/dist/ from the sources, replacing what was there.
+
+        Args:
+            static_folder (str): The app's static folder.
+
+        Returns:
+            dict: The new manifest, source name -> built file name.
+        """
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+
+        dist_dir = os.path.join(static_folder, 'dist')
+        shutil.rmtree(dist_dir, ignore_errors=True)
+        os.makedirs(dist_dir)
+        manifest = {}
+
+        def write(key, name, data):
+            built = _fingerprint(name, data)
+            target = os.path.join(dist_dir, built)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+            if os.path.splitext(name)[1] in COMPRESSIBLE:
+                with open(target + '.gz', 'wb') as f:
+                    f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    with open(target + '.br', 'wb') as f:
+                        f.write(brotli.compress(data))
+            manifest[key] = built
+
+        css_dir = os.path.join(static_folder, 'css')
+        for name in sorted(os.listdir(css_dir)) if os.path.isdir(css_dir) else []:
+            if name.endswith('.css'):
+                with open(os.path.join(css_dir, name), 'rb') as f:
+                    write(f'css/{name}', f'css/{name}', f.read())
+
+        for name, widths in IMAGES.items():
+            with open(os.path.join(static_folder, name), 'rb') as f:
+                write(name, name, f.read())
+            for width in widths:
+                data = self._resize(os.path.join(static_folder, name), width)
+                if data is not None:
+                    root, ext = os.path.splitext(name)
+                    write(_variant_key(name, width), f'{root}-{width}w{ext}', data)
+
+        with open(os.path.join(dist_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        self.manifest = manifest
+        return manifest
+
+    @staticmethod
+    def _resize(path, width):
+        # JPEG bytes of the image scaled down to width, or None without Pillow
+        try:
+            from PIL import Image
+        except ImportError:
+            return None
+        import io
+
+        with Image.open(path) as image:
+            if image.width <= width:
+                return None
+            height = round(image.height * width / image.width)
+            resized = image.convert('RGB').resize((width, height), Image.LANCZOS)
+            out = io.BytesIO()
+            resized.save(out, 'JPEG', quality=85, optimize=True, progressive=True)
+            return out.getvalue()
+
+
+assets = Assets()
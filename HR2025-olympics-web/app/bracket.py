@@ -0,0 +1,83 @@
+class BracketGraph:
+    """
+    Parent/child adjacency of one event's bracket, built from its loaded matches.
+
+    Every match points at the (up to two) matches it takes its players from
+    through last_match1_id / last_match2_id; the graph keeps the reverse
+    edges so a result can be pushed forward without querying. A changed
+    winner walks the later rounds once, O(depth), and every row it touches
+    is only modified in the session, so the caller's commit writes all of
+    them in one flush.
+    """
+
+    def __init__(self, matches):
+        self.matches = {match.id: match for match in matches}
+        self._children = {}
+        for match in self.matches.values():
+            for slot, parent_id in ((1, match.last_match1_id), (2, match.last_match2_id)):
+                if parent_id is not None:
+                    self._children.setdefault(parent_id, []).append((match, slot))
+        # Matches modified through this graph, by ID
+        self.changed = {}
+
+    def __contains__(self, match_id):
+        return match_id in self.matches
+
+    def get(self, match_id):
+        return self.matches.get(match_id)
+
+    def children(self, match_id):
+        """
+        Matches fed by the given one.
+
+        Returns:
+            list: (match, slot) pairs, slot being 1 or 2 for player1/player2.
+        """
+        return self._children.get(match_id, [])
+
+    def set_result(self, match_id, score1, score2, winner):
+        """
+        Record a result and carry the winner through the later rounds.
+
+        When the winner changes, the player moves into the matches this one
+        feeds. A later match whose players changed while it already had a
+        result is reset (scores 0, no winner), and the player it had sent
+        on is withdrawn further down in the same way.
+
+        Args:
+            match_id (int): The match the result belongs to.
+            score1 (int): Score of player 1.
+            score2 (int): Score of player 2.
+            winner (int): The winning player ID, or None for undecided.
+
+        Returns:
+            bool: Whether the match's own result changed.
+        """
+        match = self.matches[match_id]
+        if (match.score1, match.score2, match.winner_player_id) == (score1, score2, winner):
+            return False
+
+        previous = match.winner_player_id
+        match.score1, match.score2, match.winner_player_id = score1, score2, winner
+        self.changed[match.id] = match
+        if winner != previous:
+            self._advance(match.id, winner)
+        return True
+
+    def _advance(self, match_id, player_id):
+        # Iterative walk down the bracket from match_id
+        pending = [(match_id, player_id)]
+        while pending:
+            parent_id, player_id = pending.pop()
+            for child, slot in self.children(parent_id):
+                field = f'player{slot}_id'
+                if getattr(child, field) == player_id:
+                    continue
+                setattr(child, field, player_id)
+                self.changed[child.id] = child
+                if child.winner_player_id is not None or child.score1 or child.score2:
+                    # Its result was played between other players: drop it
+                    had_winner = child.winner_player_id is not None
+                    child.score1, child.score2, child.winner_player_id = 0, 0, None
+                    if had_winner:
+                        pending.append((child.id, None))
@@ -0,0 +1,463 @@
+import calendar
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from email.utils import formatdate
+from functools import wraps
+from threading import Lock
+from flask import g, request, make_response, has_app_context
+
+
+class DataVersions:
+    """
+    Monotonically increasing version numbers for the data behind public pages.
+
+    A scope names a slice of the data: 'events' (the event list), 'houses'
+    (the standings), 'players' (player names) or 'event:<id>' (one bracket).
+    Every management commit calls bump() for the scopes it touched; a page's
+    version is the highest version of the scopes it depends on.
+
+    The versions are kept in the data_versions table, so a write handled by
+    one server process (or a CLI command) is seen by all of them. A request
+    reads the whole table once, on first use, and works with that snapshot;
+    the in-process caches built on the versions (pages, fragments, houses,
+    the player name index) then notice the change on their next lookup.
+
+    ETags also carry a per-process epoch, for the templates and code the
+    process runs: another worker never answers 304 to a tag it did not hand
+    out.
+    """
+
+    COUNTER = '*'
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._started = time.time()
+        self._listeners = {}  # scope -> callbacks(previous version, new version)
+
+    def init_app(self, app):
+        # Every request starts from a fresh snapshot
+        app.before_request(self.forget)
+
+    def forget(self):
+        if has_app_context():
+            g.pop('data_versions', None)
+
+    @staticmethod
+    def select():
+        from .models import db, DataVersion
+        return db.select(DataVersion.scope, DataVersion.version, DataVersion.changed_at)
+
+    def load(self, rows):
+        # Keep the rows of select() as the current request's snapshot
+        versions = {
+            scope: (version, calendar.timegm(changed_at.timetuple()))
+            for scope, version, changed_at in rows
+        }
+        if has_app_context():
+            g.data_versions = versions
+        return versions
+
+    def _snapshot(self):
+        versions = g.get('data_versions') if has_app_context() else None
+        if versions is None:
+            from .models import db
+            versions = self.load(db.session.execute(self.select()))
+        return versions
+
+    def on_change(self, scope, callback):
+        # callback(previous, version) runs in the process that bumped the scope
+        self._listeners.setdefault(scope, []).append(callback)
+
+    def bump(self, *scopes):
+        """
+        Give the scopes a new version and commit it.
+
+        The counter row is updated first, which locks it until the commit, so
+        concurrent bumps from other processes are serialized.
+
+        Returns:
+            int: The new version.
+        """
+        from .models import db, DataVersion
+
+        now = datetime.utcnow()
+        counter = db.session.execute(
+            db.update(DataVersion).where(DataVersion.scope == self.COUNTER)
+            .values(version=DataVersion.version + 1, changed_at=now)
+        )
+        if counter.rowcount == 0:
+            db.session.add(DataVersion(scope=self.COUNTER, version=1, changed_at=now))
+            db.session.flush()
+        version = db.session.scalar(db.select(DataVersion.version).where(DataVersion.scope == self.COUNTER))
+
+        scopes = set(scopes)
+        previous = dict(db.session.execute(
+            db.select(DataVersion.scope, DataVersion.version).where(DataVersion.scope.in_(scopes))
+        ).all())
+        if previous:
+            db.session.execute(
+                db.update(DataVersion).where(DataVersion.scope.in_(previous))
+                .values(version=version, changed_at=now)
+            )
+        db.session.add_all(
+            DataVersion(scope=scope, version=version, changed_at=now) for scope in scopes - set(previous)
+        )
+        db.session.commit()
+        self.forget()
+
+        for scope in scopes:
+            for callback in self._listeners.get(scope, ()):
+                callback(previous.get(scope, 0), version)
+        return version
+
+    def get(self, *scopes):
+        # (version, last modified) of the most recently changed scope
+        versions = self._snapshot()
+        return max((versions.get(scope, (0, self._started)) for scope in scopes), default=(0, self._started))
+
+
+data_versions = DataVersions()
+
+
+class PageCache:
+    """
+    In-process LRU cache of rendered public pages.
+
+    Entries are keyed by (endpoint, view arguments, query string) and the cache
+    is bounded by the total size of the cached bodies. Each entry remembers the
+    data version it was rendered at; once a management commit bumps one of its
+    scopes the entry no longer matches and the page is rendered again, so only
+    the affected pages are rebuilt.
+
+    Compressed copies of a page (see app/compression.py) are kept in its entry
+    and count towards the bound, so a hot page is compressed once per data
+    version and dropped together with the page.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def init_app(self, app):
+        # Read the memory bound from the app config and start empty
+        self.max_bytes = app.config.get('PAGE_CACHE_MAX_BYTES', self.max_bytes)
+        self.clear()
+
+    @staticmethod
+    def make_key(endpoint, view_args, query_string=b''):
+        return endpoint, tuple(sorted((view_args or {}).items())), query_string
+
+    def get(self, key, etag):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    @staticmethod
+    def _entry_size(entry):
+        return len(entry[0]) + sum(len(data) for data in entry[4].values())
+
+    def set(self, key, body, status, headers, etag):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= self._entry_size(old)
+            # The last item holds the compressed variants, by encoding
+            self._entries[key] = (body, status, headers, etag, {})
+            self._size += len(body)
+            self._evict()
+
+    def get_variant(self, key, etag, encoding):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] != etag:
+                return None
+            return entry[4].get(encoding)
+
+    def set_variant(self, key, etag, encoding, data):
+        # Attach a compressed copy to the entry rendered at etag, if still cached
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] != etag or encoding in entry[4]:
+                return
+            entry[4][encoding] = data
+            self._size += len(data)
+            self._evict()
+
+    def _evict(self):
+        # Drop the least recently used pages until we are under the bound
+        while self._size > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self._size -= self._entry_size(old)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+
+page_cache = PageCache()
+
+
+class FragmentCache:
+    """
+    In-process LRU cache of rendered template fragments ({% cache %} blocks,
+    see app/fragments.py), bounded by the total length of the cached markup.
+
+    Keys already contain the version of the data a fragment shows, so entries
+    are never invalidated: outdated ones are simply no longer asked for and
+    age out.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_bytes = app.config.get('FRAGMENT_CACHE_MAX_BYTES', self.max_bytes)
+        self.clear()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self._size -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+
+fragment_cache = FragmentCache()
+
+
+HouseInfo = namedtuple('HouseInfo', ['id', 'name', 'color', 'multiplier'])
+
+
+class HouseCache:
+    """
+    Read-through cache of the house reference data (id, name, color and
+    scoring multiplier).
+
+    The houses are read with one query on first use and kept until the
+    'houses' data version moves on, so every write that already calls
+    data_changed('houses') (house rankings, awarding points, seeding) also
+    refreshes this cache. Points are not cached; they change too often.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._houses = {}
+
+    def _current(self):
+        version, _ = data_versions.get('houses')
+        with self._lock:
+            if version != self._version:
+                from .models import db, Houses
+                rows = db.session.execute(db.select(Houses.id, Houses.name, Houses.color, Houses.multiplier).order_by(Houses.id))
+                self._houses = {row.id: HouseInfo(*row) for row in rows}
+                # An empty table is not cached, so houses seeded later show up
+                self._version = version if self._houses else None
+            return self._houses
+
+    def all(self):
+        return list(self._current().values())
+
+    def get(self, house_id):
+        return self._current().get(house_id)
+
+    def ids(self):
+        return set(self._current())
+
+    def choices(self):
+        # (id, name) pairs for select fields
+        return [(house.id, house.name) for house in self._current().values()]
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+
+house_cache = HouseCache()
+
+
+def data_changed(*scopes):
+    # Called by the management routes and CLI commands after they commit
+    return data_versions.bump(*scopes)
+
+
+def _resolve_scopes(scopes):
+    # Fill placeholders such as 'event:{match_id}' from the view arguments
+    return [scope.format(**(request.view_args or {})) for scope in scopes]
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # Weak comparison: compression hands out the tag as W/"..."
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+
+def _add_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+    # Let browsers keep the page but revalidate it on every visit
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _etag(scopes, vary):
+    version, last_modified = data_versions.get(*_resolve_scopes(scopes))
+    etag = f"{data_versions.epoch}-{version}"
+    if vary is not None:
+        etag = f"{etag}-{vary()}"
+    return etag, last_modified
+
+
+def check_conditional(scopes, vary=None):
+    """
+    Validators for the current request and, when the client's copy is
+    still current, the 304 response to send.
+
+    Returns:
+        tuple: (etag, last_modified, response or None)
+    """
+    etag, last_modified = _etag(scopes, vary)
+    if request.method == 'GET' and _not_modified(etag, last_modified):
+        return etag, last_modified, _add_validators(make_response('', 304), etag, last_modified)
+    return etag, last_modified, None
+
+
+def finish_conditional(response, etag, last_modified):
+    # Attach the validators to a freshly built response
+    response = make_response(response)
+    if response.status_code == 200:
+        _add_validators(response, etag, last_modified)
+    return response
+
+
+def cached_response(etag):
+    # The current page from the page cache if it was rendered at etag
+    key = page_cache.make_key(request.endpoint, request.view_args, request.query_string)
+    entry = page_cache.get(key, etag)
+    if entry is None:
+        return None
+    body, status, headers = entry[:3]
+    g.page_cache_key = key, etag
+    response = make_response(body, status, headers)
+    response.headers['X-Cache'] = 'HIT'
+    return response
+
+
+def store_response(response, etag):
+    # Keep a successful page for the next request with the same etag
+    response = make_response(response)
+    if response.status_code == 200 and not response.direct_passthrough:
+        key = page_cache.make_key(request.endpoint, request.view_args, request.query_string)
+        page_cache.set(key, response.get_data(), response.status_code,
+                       [('Content-Type', response.content_type)], etag)
+        g.page_cache_key = key, etag
+    response.headers['X-Cache'] = 'MISS'
+    return response
+
+
+def conditional(*scopes, vary=None):
+    """
+    Emit ETag / Last-Modified from the data version of the given scopes and
+    answer a matching conditional GET with 304 before the view runs.
+
+    vary is an optional callable whose result is added to the ETag, for pages
+    that also change with something other than the data (e.g. the clock).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag, last_modified, not_modified = check_conditional(scopes, vary)
+            if not_modified is not None:
+                return not_modified
+            return finish_conditional(view(*args, **kwargs), etag, last_modified)
+        # Read by the async spectator path (app/aio.py)
+        wrapper.data_scopes = scopes
+        wrapper.data_vary = vary
+        return wrapper
+    return decorator
+
+
+def cached_page(*scopes, vary=None):
+    """
+    Serve a public GET view from the page cache, rendering it only when the
+    data version of its scopes (or the vary value) changed. Also handles
+    conditional GETs.
+    """
+    def decorator(view):
+        @conditional(*scopes, vary=vary)
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            etag, _ = _etag(scopes, vary)
+            return cached_response(etag) or store_response(view(*args, **kwargs), etag)
+        wrapper.page_cached = True
+        return wrapper
+    return decorator
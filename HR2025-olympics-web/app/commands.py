@@ -0,0 +1,74 @@
+import time
+import click
+from . import db
+
+
+# First migration: the schema of databases created before migrations were used
+BASELINE_REVISION = 'bb759dbe02b4'
+
+
+def migrate_schema():
+    """
+    Create or upgrade the database schema.
+
+    An empty database gets every table from the models and is stamped with
+    the newest migration. A database without migration history is taken to
+    have the baseline schema and is upgraded from there; any other database
+    is upgraded to the newest migration.
+    """
+    from flask_migrate import stamp, upgrade
+
+    tables = set(db.inspect(db.engine).get_table_names())
+    if not tables:
+        db.create_all()
+        stamp()
+        return
+    if 'alembic_version' not in tables:
+        stamp(revision=BASELINE_REVISION)
+    upgrade()
+
+
+def register_commands(app):
+    # One-shot maintenance commands, run with `flask --app run.py <command>`
+
+    @app.cli.command('bootstrap')
+    def bootstrap():
+        """Bring the schema up to date and seed the default houses, players and scoring rules."""
+        from .models import Houses, Players, ScoringRule
+        from .utils import rebuild_standings
+        from .cache import data_changed
+
+        started = time.perf_counter()
+        migrate_schema()
+        houses = Houses.create_default_houses()
+        players = Players.create_default_players()
+        ScoringRule.create_default_rules()
+        rebuild_standings()
+        db.session.commit()
+        data_changed('houses', 'players')
+        click.echo(
+            f"Bootstrap done in {time.perf_counter() - started:.3f}s: "
+            f"{houses} houses and {players} players added."
+        )
+
+    @app.cli.command('recompute-standings')
+    def recompute():
+        """Recompute every event's house points from the current scoring rules."""
+        from .utils import recompute_standings
+        from .cache import data_changed
+
+        started = time.perf_counter()
+        written = recompute_standings()
+        db.session.commit()
+        # The versions are shared, so running servers refresh their pages too
+        data_changed('houses')
+        click.echo(f"Recomputed {written} awards in {time.perf_counter() - started:.3f}s.")
+
+    @app.cli.command('build-assets')
+    def build_assets():
+        """Fingerprint, compress and resize the static assets into static/dist/."""
+        from .assets import assets
+
+        started = time.perf_counter()
+        manifest = assets.build(app.static_folder)
+        click.echo(f"Built {len(manifest)} assets in {time.perf_counter() - started:.3f}s.")
@@ -0,0 +1,101 @@
+import gzip
+from flask import g, request
+from .cache import page_cache
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+# Text responses worth compressing; images and fonts are compressed already
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+}
+
+
+class Compressor:
+    """
+    gzip / brotli compression of responses, negotiated from Accept-Encoding.
+
+    Runs after every request and only touches complete 200 responses of a
+    text type above COMPRESS_MIN_BYTES that carry no Content-Encoding yet
+    (the pre-compressed files of app/assets.py already do). Pages served
+    from the page cache keep their compressed bytes in the cache entry, so
+    they are compressed once per data version instead of on every request.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.min_bytes = 500
+        self.gzip_level = 6
+        self.brotli_quality = 5
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_ENABLED', self.enabled)
+        self.min_bytes = app.config.get('COMPRESS_MIN_BYTES', self.min_bytes)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', self.gzip_level)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', self.brotli_quality)
+        if self.enabled:
+            app.after_request(self.compress)
+
+    @property
+    def encodings(self):
+        # In order of preference
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def _compressible(self, response):
+        return (
+            response.status_code == 200
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and 'Content-Encoding' not in response.headers
+            and 'no-transform' not in response.headers.get('Cache-Control', '')
+            and response.mimetype in COMPRESSIBLE_TYPES
+        )
+
+    def _encode(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def compress(self, response):
+        """
+        Compress the response in place for the current request.
+
+        Also used directly by the async spectator path, which bypasses the
+        Flask request hooks.
+        """
+        if not self._compressible(response):
+            return response
+        # The representation depends on the header even when left uncompressed
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < self.min_bytes:
+            return response
+
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        cached = g.get('page_cache_key')
+        data = None
+        if cached is not None:
+            data = page_cache.get_variant(*cached, encoding)
+        if data is None:
+            body = response.get_data()
+            if len(body) < self.min_bytes:
+                return response
+            data = self._encode(body, encoding)
+            if cached is not None:
+                page_cache.set_variant(*cached, encoding, data)
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        # Same content, different bytes: the ETag can only be weak now
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+compressor = Compressor()
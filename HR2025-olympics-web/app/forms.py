@@ -1,14 +1,15 @@
 # 表单可以参照之前的
 
 from flask_wtf import FlaskForm
-from wtforms import StringField, IntegerField, SelectField, SubmitField, TextAreaField
-from wtforms.validators import InputRequired, NumberRange, DataRequired, ValidationError
+from wtforms import StringField, IntegerField, SelectField, SubmitField, TextAreaField, DateTimeLocalField
+from wtforms.validators import InputRequired, NumberRange, DataRequired, Length, ValidationError
 from .models import Match_info, Players, Houses
+from .cache import house_cache
 
 class MatchInitializationForm(FlaskForm):
     name = StringField('Match Name', validators=[DataRequired()])
-    start_time = StringField('Start Time', validators=[DataRequired()])
-    end_time = StringField('End Time', validators=[DataRequired()])
+    start_time = DateTimeLocalField('Start Time', format=['%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M'], validators=[DataRequired()])
+    end_time = DateTimeLocalField('End Time', format=['%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M'], validators=[DataRequired()])
     status = SelectField('Status', choices=[(0, 'Scheduled'), (1, 'In Progress'), (2, 'Completed')], validators=[DataRequired()])
     category = SelectField('Category', choices=[('Individual', 'Individual'), ('Team', 'Team'), ('House', 'House')], validators=[DataRequired()])
     description = TextAreaField('Description', validators=[DataRequired()])
@@ -34,8 +35,6 @@ class MatchScoreForm(FlaskForm):
                 player2 = Players.query.get(match.player2_id)
                 if player2:
                     self.winner.choices.append((player2.id, player2.name))
-            # Debug: Print the winner choices
-            print(f"Winner choices: {self.winner.choices}")
 
 
 class MatchWinnerForm(FlaskForm):
@@ -45,7 +44,7 @@ class MatchWinnerForm(FlaskForm):
     submit = SubmitField('Save Rankings')
 
 class AddPlayerForm(FlaskForm):
-    name = StringField('Player Name', validators=[InputRequired()])  # Use InputRequired
+    name = StringField('Player Name', validators=[InputRequired(), Length(max=Players.NAME_LENGTH)])
     medals = IntegerField('Number of Medals', validators=[InputRequired()])  # Use InputRequired
     house1 = SelectField('Primary House', coerce=str, validators=[InputRequired()])  # Use InputRequired
     house2 = SelectField('Secondary House (Optional)', coerce=str)
@@ -53,12 +52,12 @@ class AddPlayerForm(FlaskForm):
 
     def __init__(self, *args, **kwargs):
         super(AddPlayerForm, self).__init__(*args, **kwargs)
-        self.house1.choices = [(h.id, h.name) for h in Houses.query.all()]
-        self.house2.choices = [(0, 'None')] + [(h.id, h.name) for h in Houses.query.all()]
+        self.house1.choices = house_cache.choices()
+        self.house2.choices = [(0, 'None')] + house_cache.choices()
 
 
 class EditPlayerForm(FlaskForm):
-    name = StringField('Player Name', validators=[InputRequired()])  # Use InputRequired
+    name = StringField('Player Name', validators=[InputRequired(), Length(max=Players.NAME_LENGTH)])
     medals = IntegerField('Number of Medals', validators=[InputRequired()])  # Use InputRequired
     house1 = SelectField('Primary House', coerce=str, validators=[InputRequired()])  # Use InputRequired
     house2 = SelectField('Secondary House (Optional)', coerce=str)
@@ -66,8 +65,8 @@ class EditPlayerForm(FlaskForm):
 
     def __init__(self, *args, **kwargs):
         super(EditPlayerForm, self).__init__(*args, **kwargs)
-        self.house1.choices = [(h.id, h.name) for h in Houses.query.all()]
-        self.house2.choices = [(0, 'None')] + [(h.id, h.name) for h in Houses.query.all()]
+        self.house1.choices = house_cache.choices()
+        self.house2.choices = [(0, 'None')] + house_cache.choices()
 
 
 class CreateMatchesForm(FlaskForm):
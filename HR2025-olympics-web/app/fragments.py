@@ -0,0 +1,84 @@
+"""
+Template fragment caching and the on-disk Jinja bytecode cache.
+
+A {% cache %} block renders its body once per key and stitches the stored
+markup in afterwards:
+
+    {% cache match_info.id, round_version(round_matches) %}
+        ...
+    {% endcache %}
+
+The key is the template name and line of the block plus the given values,
+so the values only need to say which version of the data the fragment
+shows. round_version() fingerprints one bracket round (IDs, players and
+scores), which lets an event page or the results grid re-render only the
+round a result changed.
+
+Fragments only pay off where the rest of the page is rendered anyway: a
+page served whole from the page cache (cached_page) is already reused as
+long as its data version holds.
+"""
+import hashlib
+import os
+from jinja2 import nodes, FileSystemBytecodeCache
+from jinja2.ext import Extension
+from .cache import data_versions, fragment_cache
+
+
+class FragmentCacheExtension(Extension):
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [nodes.Const(f'{parser.name}:{lineno}')]
+        while parser.stream.current.type != 'block_end':
+            if len(args) > 1:
+                parser.stream.expect('comma')
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cache', [nodes.List(args)]), [], [], body).set_lineno(lineno)
+
+    def _cache(self, key, caller):
+        key = tuple(key)
+        rendered = fragment_cache.get(key)
+        if rendered is None:
+            rendered = caller()
+            fragment_cache.set(key, rendered)
+        return rendered
+
+
+def _player_ids(match):
+    if isinstance(match, dict):
+        # Football round 1, paired by pair_football_round()
+        return tuple(player.id if player else None for player in match['team1'] + match['team2'])
+    return match.player1_id, match.player2_id
+
+
+def _get(match, field):
+    return match[field] if isinstance(match, dict) else getattr(match, field)
+
+
+def round_version(round_matches):
+    # Fingerprint of everything a rendered round shows; player names are
+    # covered by the 'players' data version
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(repr(data_versions.get('players')[0]).encode())
+    for match in round_matches:
+        digest.update(repr((
+            _get(match, 'id'), _player_ids(match),
+            _get(match, 'score1'), _get(match, 'score2'), _get(match, 'winner_player_id'),
+        )).encode())
+    return digest.hexdigest()
+
+
+def init_app(app):
+    fragment_cache.init_app(app)
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.add_template_global(round_version)
+
+    # Compiled templates on disk, so new workers skip compiling them; Jinja
+    # checks the source checksum, so an edited template is compiled again
+    if app.config.get('JINJA_BYTECODE_CACHE', True):
+        directory = app.config.get('JINJA_BYTECODE_CACHE_DIR') or os.path.join(app.instance_path, 'jinja_cache')
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
@@ -0,0 +1,118 @@
+import json
+import time
+from datetime import datetime, timedelta
+from .models import db, LiveEvent
+
+
+class LiveBroker:
+    """
+    Publish/subscribe hub for the Server-Sent Events feeds, shared by every
+    server process through the live_events table.
+
+    Management routes publish a small JSON delta once per commit; it is
+    encoded a single time and stored as one row, whose ID is also the SSE
+    event ID. Streams pick new rows up by polling the table, one indexed
+    query per poll interval, so a message published by any worker reaches
+    the spectators of all of them. A browser that reconnects sends the ID
+    of the last message it saw as Last-Event-ID and first gets what it
+    missed; rows are kept for retention seconds.
+
+    stream() is the feed for WSGI servers, where an open stream holds a
+    thread, so it ends after max_age seconds and the browser's EventSource
+    reconnects on its own. The ASGI app (app/aio.py) serves the feeds on
+    its event loop instead.
+    """
+
+    def __init__(self, heartbeat=15, max_age=300, poll=1.0, retention=600):
+        self.heartbeat = heartbeat
+        self.max_age = max_age
+        self.poll = poll
+        self.retention = retention
+
+    def init_app(self, app):
+        self.heartbeat = app.config.get('LIVE_HEARTBEAT_SECONDS', self.heartbeat)
+        self.max_age = app.config.get('LIVE_STREAM_MAX_SECONDS', self.max_age)
+        self.poll = app.config.get('LIVE_POLL_SECONDS', self.poll)
+        self.retention = app.config.get('LIVE_RETENTION_SECONDS', self.retention)
+
+    def publish(self, channel, event, data):
+        """
+        Store a message for the channel's streams and commit it.
+
+        Messages older than the retention period are pruned at the same time.
+
+        Returns:
+            int: The message's event ID.
+        """
+        entry = LiveEvent(channel=channel, event=event, data=json.dumps(data, separators=(',', ':')))
+        db.session.add(entry)
+        db.session.execute(
+            db.delete(LiveEvent).where(LiveEvent.created_at < datetime.utcnow() - timedelta(seconds=self.retention))
+        )
+        db.session.commit()
+        return entry.id
+
+    @staticmethod
+    def format(entry):
+        return f"id: {entry.id}\nevent: {entry.event}\ndata: {entry.data}\n\n"
+
+    @staticmethod
+    def last_id_select():
+        return db.select(db.func.coalesce(db.func.max(LiveEvent.id), 0))
+
+    @staticmethod
+    def since_select(after, channel=None):
+        # Messages after the given event ID, oldest first
+        stmt = db.select(LiveEvent).where(LiveEvent.id > after).order_by(LiveEvent.id)
+        if channel is not None:
+            stmt = stmt.where(LiveEvent.channel == channel)
+        return stmt
+
+    @staticmethod
+    def resume_from(last_event_id, last_id):
+        """
+        Event ID a stream continues after: the client's Last-Event-ID when
+        it sent a usable one, else the newest message (nothing is replayed).
+        """
+        try:
+            after = int(last_event_id)
+        except (TypeError, ValueError):
+            return last_id
+        # An ID from before the table was emptied would hold the stream back
+        return min(max(after, 0), last_id)
+
+    def _read(self, stmt):
+        # A short transaction per poll, so every poll sees the newest rows
+        with db.engine.connect() as connection:
+            return connection.execute(stmt).all()
+
+    def stream(self, channel, last_event_id=None):
+        # Generator for a streaming response (run with the app context);
+        # sends a comment line as heartbeat
+        after = self.resume_from(last_event_id, self._read(self.last_id_select())[0][0])
+        deadline = time.monotonic() + self.max_age
+        yield "retry: 2000\n\n"
+        quiet_since = time.monotonic()
+        while True:
+            for entry in self._read(self.since_select(after, channel)):
+                after = entry.id
+                quiet_since = time.monotonic()
+                yield self.format(entry)
+
+            now = time.monotonic()
+            if now >= deadline:
+                return  # the client reconnects after the retry delay
+            if now - quiet_since >= self.heartbeat:
+                quiet_since = now
+                yield ": keep-alive\n\n"
+            time.sleep(min(self.poll, deadline - now))
+
+
+live = LiveBroker()
+
+
+def event_channel(match_info_id):
+    return f"event:{match_info_id}"
+
+
+HOUSES_CHANNEL = "houses"
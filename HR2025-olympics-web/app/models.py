@@ -1,3 +1,4 @@
+from datetime import datetime
 from sqlalchemy import select, and_
 from flask_sqlalchemy import SQLAlchemy
 from . import db
@@ -6,7 +7,8 @@ from . import db
 
 
 # Expose models for import
-__all__ = ['Houses', 'Players', 'Match_info', 'Matches']
+__all__ = ['Houses', 'Players', 'Match_info', 'Matches', 'HousePointsLedger', 'HouseStandings', 'ScoringRule',
+           'DataVersion', 'LiveEvent']
 
 
 # Represents a house (team/house in the competition)
@@ -21,6 +23,8 @@ class Houses(db.Model):
     color = db.Column(db.TEXT)
     # Points scored by the house
     points = db.Column(db.Integer, default=0, nullable=False)
+    # Factor applied to the placement points the house earns
+    multiplier = db.Column(db.Float, default=1.0, server_default='1', nullable=False)
 
     @classmethod
     def new(cls, id_, name, color, points=0):
@@ -50,24 +54,35 @@ class Houses(db.Model):
             {"id": "F0", "name": "Faculty Team", "color": "#000000", "points": 0},
         ]
 
-        for house_data in default_houses:
-            # Check if the house with this id already exists in the database.
-            if not Houses.query.get(house_data["id"]):
-                new_house = Houses(**house_data)
-                db.session.add(new_house)
-        
+        # One query for the houses that already exist, one bulk insert for the rest
+        existing = set(db.session.scalars(select(Houses.id)))
+        missing = [house for house in default_houses if house["id"] not in existing]
+        if missing:
+            db.session.execute(db.insert(Houses), missing)
+
         # Commit all new additions
         db.session.commit()
+        return len(missing)
 
 
 # Represents players/participants in the competition
 class Players(db.Model):
     __tablename__ = "players"
+    __table_args__ = (
+        # Name lookups (bracket creation, winners form) and the keyset-paginated
+        # player list, optionally of one house
+        db.Index('ix_players_name_id', 'name', 'id'),
+        db.Index('ix_players_house_id1_name_id', 'house_id1', 'name', 'id'),
+    )
+
+    # Longest name allowed; bounded so MySQL indexes the whole name, which
+    # the (name, id) indexes need to order a page
+    NAME_LENGTH = 100
 
     # Primary key, unique ID for each player
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     # Name of the player
-    name = db.Column(db.TEXT)
+    name = db.Column(db.String(NAME_LENGTH))
     # Number of medals won by the player
     medals = db.Column(db.Integer, default=0)
     # Primary house affiliation
@@ -77,23 +92,20 @@ class Players(db.Model):
 
     @staticmethod
     def create_default_players():
-        # Retrieve all houses from the database
-        houses = Houses.query.all()
-
         # For each house, ensure there is one player with the same name as the house.
-        for house in houses:
-            # Check if a player with this house as primary affiliation already exists
-            existing_player = Players.query.filter_by(house_id1=house.id).first()
-            if not existing_player:
-                new_player = Players(
-                    name=f"{house.id} {house.name}",   # Use the house name for the player's name
-                    medals=0,
-                    house_id1=house.id  # Set primary affiliation to this house
-                )
-                db.session.add(new_player)
-        
+        # Houses that already have a primary-affiliated player are found in one query.
+        covered = set(db.session.scalars(select(Players.house_id1).distinct()))
+        missing = [
+            {"name": f"{house.id} {house.name}", "medals": 0, "house_id1": house.id}
+            for house in Houses.query.all()
+            if house.id not in covered
+        ]
+        if missing:
+            db.session.execute(db.insert(Players), missing)
+
         # Commit all new player additions
         db.session.commit()
+        return len(missing)
 
     @classmethod
     def new(cls, name, medals, house_id1, house_id2=None):
@@ -108,8 +120,9 @@ class Players(db.Model):
 
     @staticmethod
     def house_from_id(id_):
-        # Fetches the house instance based on the given ID
-        return db.session.scalar(select(Houses).where(Houses.id == id_))
+        # Fetches the house reference data (id, name, color) from the house cache
+        from .cache import house_cache
+        return house_cache.get(id_)
 
     @property
     def whole_name(self):
@@ -122,15 +135,22 @@ class Players(db.Model):
 # Represents information about a match/event
 class Match_info(db.Model):
     __tablename__ = "match_info"
+    __table_args__ = (
+        # Event lists are ordered by status (home, keyset-paginated management
+        # list, optionally of one category) and by start time (timetable)
+        db.Index('ix_match_info_status_id', 'status', 'id'),
+        db.Index('ix_match_info_category_status_id', 'category', 'status', 'id'),
+        db.Index('ix_match_info_start_time', 'start_time'),
+    )
 
     # Primary key, unique ID for each match
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     # Name of the match/event
     name = db.Column(db.TEXT)
     # Start time of the match
-    start_time = db.Column(db.TEXT)
+    start_time = db.Column(db.DateTime)
     # End time of the match
-    end_time = db.Column(db.TEXT)
+    end_time = db.Column(db.DateTime)
     # Description of the match
     description = db.Column(db.TEXT)
     # IDs of players who placed 1st, 2nd, and 3rd
@@ -179,6 +199,12 @@ class Match_info(db.Model):
 # Represents individual matches within an event
 class Matches(db.Model):
     __tablename__ = "matches"
+    __table_args__ = (
+        # A bracket is read by event and round; propagation looks up the next match by its feeders
+        db.Index('ix_matches_match_info_id_round', 'match_info_id', 'round'),
+        db.Index('ix_matches_last_match1_id', 'last_match1_id'),
+        db.Index('ix_matches_last_match2_id', 'last_match2_id'),
+    )
 
     # Primary key, unique ID for each match instance
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -220,4 +246,100 @@ class Matches(db.Model):
             )
             self.round = last_match_round + 1
         except:
-            self.round = 0
\ No newline at end of file
+            self.round = 0
+
+
+# Append-only record of every change to a house's points
+class HousePointsLedger(db.Model):
+    __tablename__ = "house_points_ledger"
+
+    # Primary key, increasing in the order the points were awarded
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # House receiving the points
+    house_id = db.Column(db.String(2), db.ForeignKey('houses.id'), nullable=False, index=True)
+    # Event the points were awarded for (None for manual adjustments)
+    match_info_id = db.Column(db.Integer, db.ForeignKey('match_info.id'), nullable=True, index=True)
+    # Placement in the event (1, 2, 3; None for manual adjustments)
+    placement = db.Column(db.Integer, nullable=True)
+    # Points awarded (negative for corrections)
+    points = db.Column(db.Integer, nullable=False)
+    # When the entry was recorded
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Materialized leaderboard, updated on every award with the rank already computed
+class HouseStandings(db.Model):
+    __tablename__ = "house_standings"
+
+    # One row per house
+    house_id = db.Column(db.String(2), db.ForeignKey('houses.id'), primary_key=True)
+    house = db.relationship('Houses', lazy='joined')
+    # Total points, the sum of the house's ledger entries
+    points = db.Column(db.Integer, default=0, nullable=False)
+    # Position on the leaderboard (1 = leading)
+    rank = db.Column(db.Integer, nullable=False, index=True)
+
+
+# Points for a placement in an event of a given category
+class ScoringRule(db.Model):
+    __tablename__ = "scoring_rules"
+
+    # Event category ('Individual', 'Team', 'House')
+    category = db.Column(db.String(20), primary_key=True)
+    # Placement in the event (1, 2, 3)
+    placement = db.Column(db.Integer, primary_key=True)
+    # Points before the house multiplier
+    points = db.Column(db.Integer, nullable=False)
+
+    # Points for 1st, 2nd and 3rd place; also what the winners form awarded
+    # before the rules were configurable
+    DEFAULT_POINTS = {
+        'Individual': (25, 20, 15),
+        'Team': (50, 45, 40),
+        'House': (75, 65, 55),
+    }
+
+    @staticmethod
+    def create_default_rules():
+        existing = set(db.session.execute(select(ScoringRule.category, ScoringRule.placement)))
+        missing = [
+            {"category": category, "placement": placement, "points": points}
+            for category, row in ScoringRule.DEFAULT_POINTS.items()
+            for placement, points in enumerate(row, start=1)
+            if (category, placement) not in existing
+        ]
+        if missing:
+            db.session.execute(db.insert(ScoringRule), missing)
+        db.session.commit()
+        return len(missing)
+
+
+# Version of a slice of the data behind the public pages (see app/cache.py),
+# shared by every server process
+class DataVersion(db.Model):
+    __tablename__ = "data_versions"
+
+    # Scope name ('events', 'houses', 'players', 'event:<id>'); the row '*'
+    # holds the counter the versions are drawn from
+    scope = db.Column(db.String(50), primary_key=True)
+    # Value of the counter when the scope last changed
+    version = db.Column(db.Integer, nullable=False)
+    # When the scope last changed (UTC)
+    changed_at = db.Column(db.DateTime, nullable=False)
+
+
+# Message pushed to the spectators' Server-Sent Events feeds (see app/live.py);
+# kept for a while so a reconnecting browser can catch up
+class LiveEvent(db.Model):
+    __tablename__ = "live_events"
+
+    # Primary key, also the SSE event ID the browser sends back as Last-Event-ID
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # Feed the message belongs to ('houses', 'event:<id>')
+    channel = db.Column(db.String(50), nullable=False)
+    # SSE event name ('matches', 'podium', 'standings')
+    event = db.Column(db.String(30), nullable=False)
+    # JSON payload
+    data = db.Column(db.TEXT, nullable=False)
+    # When the message was published, for pruning
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,124 @@
+import time
+from collections import defaultdict, deque
+from threading import Lock
+from flask import g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+
+
+class RequestProfiler:
+    """
+    Per-request instrumentation: wall time, SQL statement count and time, and
+    template render time.
+
+    The numbers are sent back in a Server-Timing header and kept in a rolling
+    window per endpoint for the management summary page. Nothing is hooked
+    up unless PROFILING_ENABLED is set, so a disabled profiler costs nothing.
+    Independently, SLOW_QUERY_MS > 0 logs every statement slower than that.
+    """
+
+    def __init__(self, window=500):
+        self.window = window
+        self.enabled = False
+        self.slow_query_ms = 0
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = Lock()
+
+    def init_app(self, app, engine):
+        self.enabled = app.config.get('PROFILING_ENABLED', False)
+        self.slow_query_ms = app.config.get('SLOW_QUERY_MS', 0)
+        self.window = app.config.get('PROFILING_WINDOW', self.window)
+        self.logger = app.logger
+
+        if self.enabled or self.slow_query_ms:
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+            event.listen(engine, 'handle_error', self._handle_error)
+        if self.enabled:
+            app.before_request(self._before_request)
+            app.after_request(self._after_request)
+            before_render_template.connect(self._before_render, app)
+            template_rendered.connect(self._after_render, app)
+
+    # SQL timing
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = (time.perf_counter() - conn.info['query_start'].pop()) * 1000
+        if self.enabled and has_request_context() and 'profile' in g:
+            g.profile['sql_count'] += 1
+            g.profile['sql_ms'] += elapsed
+        if self.slow_query_ms and elapsed >= self.slow_query_ms:
+            self.logger.warning("Slow query (%.1f ms): %s %r", elapsed, statement, parameters)
+
+    def _handle_error(self, context):
+        # A failed statement never reaches after_cursor_execute: drop its
+        # start time so the next statement on this connection pops its own
+        if context.connection is not None:
+            starts = context.connection.info.get('query_start')
+            if starts:
+                starts.pop()
+
+    # Template timing
+    def _before_render(self, sender, template, context, **extra):
+        if 'profile' in g:
+            g.profile['render_start'] = time.perf_counter()
+
+    def _after_render(self, sender, template, context, **extra):
+        if 'profile' in g and 'render_start' in g.profile:
+            g.profile['template_ms'] += (time.perf_counter() - g.profile.pop('render_start')) * 1000
+
+    # Request timing
+    def _before_request(self):
+        g.profile = {'start': time.perf_counter(), 'sql_count': 0, 'sql_ms': 0.0, 'template_ms': 0.0}
+
+    def _after_request(self, response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        wall_ms = (time.perf_counter() - profile['start']) * 1000
+        response.headers['Server-Timing'] = (
+            f'app;dur={wall_ms:.2f}, '
+            f'db;dur={profile["sql_ms"]:.2f};desc="{profile["sql_count"]} queries", '
+            f'tpl;dur={profile["template_ms"]:.2f}'
+        )
+        if request.endpoint:
+            with self._lock:
+                self._samples[request.endpoint].append(
+                    (wall_ms, profile['sql_count'], profile['sql_ms'], profile['template_ms'])
+                )
+        return response
+
+    def summary(self):
+        """
+        Rolling per-endpoint summary, slowest median first.
+
+        Returns:
+            list: One dict per endpoint with the request count, p50/p95/max
+            wall time and the average SQL count, SQL time and render time.
+        """
+        with self._lock:
+            samples = {endpoint: list(rows) for endpoint, rows in self._samples.items()}
+        summary = []
+        for endpoint, rows in samples.items():
+            walls = sorted(row[0] for row in rows)
+            n = len(rows)
+            summary.append({
+                'endpoint': endpoint,
+                'requests': n,
+                'p50_ms': walls[n // 2],
+                'p95_ms': walls[min(int(n * 0.95), n - 1)],
+                'max_ms': walls[-1],
+                'sql_count': sum(row[1] for row in rows) / n,
+                'sql_ms': sum(row[2] for row in rows) / n,
+                'template_ms': sum(row[3] for row in rows) / n,
+            })
+        summary.sort(key=lambda row: row['p50_ms'], reverse=True)
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+profiler = RequestProfiler()
@@ -1,26 +1,37 @@
 # -*- encoding: utf-8 -*-
-from flask import Blueprint, render_template, request, redirect, request, flash, url_for, jsonify
-from .models import Match_info, Players, Matches, Houses, db
+import csv
+import io
+from time import perf_counter
+from flask import Blueprint, render_template, request, redirect, request, flash, url_for, jsonify, Response, stream_with_context
+from .models import Match_info, Players, Matches, Houses, ScoringRule, db
 from sqlalchemy import select, and_
-from datetime import datetime
+from datetime import datetime, date, time, timedelta
 from .forms import MatchScoreForm, MatchWinnerForm, MatchInitializationForm, EditPlayerForm, AddPlayerForm, CreateMatchesForm, UpdateHousePointsForm
 from .config import SECRET_KEY
 from .utils import *
+from .cache import page_cache, cached_page, conditional, data_changed, house_cache
+from .live import live, event_channel, HOUSES_CHANNEL
+from .search import player_index
+from .profiling import profiler
 
 bp = Blueprint('main', __name__)
 
+@bp.app_template_filter('format_time')
+def format_time(value):
+    # Event times are shown to the minute
+    return value.strftime('%Y-%m-%d %H:%M') if value else ''
+
 @bp.route('/home')
 @bp.route('/')
+@cached_page('events')
 def home():
     # Retrieve matches from the database
-    matches = Match_info.query.order_by(Match_info.status.desc()).all()
-    print(f"DEBUG: Retrieved {len(matches)} matches from database.")
-    
-    # Debug print each match's hex_icon for clarity
-    for match in matches:
-        icon = match.hex_icon if match.hex_icon is not None else 'None'
-        print(f"DEBUG: Match ID {match.id} has hex_icon '{icon}'")
+    matches = db.session.scalars(events_select()).all()
+    return render_home(matches)
 
+# The render_* helpers are shared with the async spectator path (app/aio.py),
+# which loads the same data with the async engine
+def render_home(matches):
     context = {
         'matches': matches,
         'route': 'home',
@@ -28,14 +39,14 @@ def home():
     }
     return render_template('all_matches.html', **context)
 
+# Rows per page of the management player and event lists
+MANAGEMENT_PAGE_SIZE = 50
+
 @bp.route('/<key>/management/matches/all/', methods=['GET', 'POST'])
 def management_matches_all(key):
     if key != SECRET_KEY:
         return redirect('/home')
 
-    # Fetch all matches ordered by status
-    matches = Match_info.query.order_by(Match_info.status.desc()).all()
-
     # Initialize the form
     form = MatchInitializationForm()
 
@@ -45,8 +56,8 @@ def management_matches_all(key):
             # Create a new match from the form data
             new_match = Match_info.new(
                 name=request.form['name'],
-                start_time=request.form['start_time'],
-                end_time=request.form['end_time'],
+                start_time=parse_datetime(request.form['start_time']),
+                end_time=parse_datetime(request.form['end_time']),
                 status=int(request.form['status']),
                 description=request.form['description'],
                 category=request.form['category']
@@ -55,6 +66,7 @@ def management_matches_all(key):
             # Add the new match to the database
             db.session.add(new_match)
             db.session.commit()
+            data_changed('events')
 
             # Redirect to the same page after successful form submission
             return redirect(url_for('main.management_matches_all', key=key))
@@ -62,28 +74,43 @@ def management_matches_all(key):
             print(f"Error: {e}")  # Log the error
             return f"Error: {e}"
 
-    # Prepare matches summary with winner's name
+    # One page of events by (status, id), running and finished ones first
+    filters = {
+        'status': request.args.get('status', type=int),
+        'category': request.args.get('category', ''),
+    }
+    stmt = db.select(Match_info)
+    if filters['status'] is not None:
+        stmt = stmt.where(Match_info.status == filters['status'])
+    if filters['category']:
+        stmt = stmt.where(Match_info.category == filters['category'])
+    try:
+        matches, next_cursor = keyset_page(stmt, [Match_info.status, Match_info.id], request.args.get('cursor'),
+                                           MANAGEMENT_PAGE_SIZE, descending=True)
+    except ValueError:
+        return redirect(url_for('main.management_matches_all', key=key, **filters))
+
+    # Winner names and per-round progress of the whole page in one query
+    progress = event_progress([match.id for match in matches])
     matches_summary = []
     for match in matches:
-        # Fetch the winner's name using manual_1st_player_id
-        winner_name = None
-        if match.manual_1st_player_id:
-            winner = Players.query.get(match.manual_1st_player_id)
-            if winner:
-                winner_name = winner.name
-
+        event = progress.get(match.id, {'winner': None, 'rounds': []})
         matches_summary.append({
             'id': match.id,
             'name': match.name,
             'status': match.status,
             'start_time': match.start_time,
             'end_time': match.end_time,
-            'winner': winner_name,  # Use the winner's name instead of ID
+            'winner': event['winner'],  # Use the winner's name instead of ID
+            'rounds': event['rounds'],
         })
 
     # Prepare context for the template
     context = {
         'matches': matches_summary,
+        'filters': filters,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.args.get('cursor'),
         'route': 'management_matches_all',
         'is_authenticated': True,
         'form': form,
@@ -115,13 +142,20 @@ def edit_match(key, match_id):
     # Check if the DELETE button was clicked
     if request.method == 'POST' and 'delete' in request.form:
         try:
-            # Delete the match from the database
+            # Delete the match and withdraw its points in one transaction
+            standings_changed = withdraw_event_points(match_id)
             db.session.delete(match_info)
             db.session.commit()
+            if standings_changed:
+                data_changed('events', f'event:{match_id}', 'houses')
+                live.publish(HOUSES_CHANNEL, 'standings', house_standings())
+            else:
+                data_changed('events', f'event:{match_id}')
 
             # Redirect to the management matches page after deletion
             return redirect(url_for('main.management_matches_all', key=key))
         except Exception as e:
+            db.session.rollback()
             print(f"Error deleting match: {e}")
             return "Error deleting match", 500
 
@@ -135,6 +169,7 @@ def edit_match(key, match_id):
         match_info.description = form.description.data
 
         db.session.commit()
+        data_changed('events', f'event:{match_id}')
 
         # Redirect back to the management matches page
         return redirect(url_for('main.management_matches_all', key=key))
@@ -149,6 +184,7 @@ def edit_match(key, match_id):
     return render_template('edit_match.html', **context)
 
 @bp.route('/<int:match_id>/')
+@cached_page('event:{match_id}', 'players')
 def match_view(match_id):
     match_info = Match_info.query.get(match_id)
     if not match_info:
@@ -160,30 +196,13 @@ def match_view(match_id):
         Players.query.get(match_info.manual_3rd_player_id)
     ]
 
-    round_matches_list = []
-    round_number = 1
-    while round_matches := Matches.query.filter_by(round=round_number, match_info_id=match_id).all():
-        # Check if this is a football match and it's Round 1
-        if "Football" in match_info.name and round_number == 1:
-            # Combine matches in pairs for Round 1
-            combined_matches = []
-            for i in range(0, len(round_matches), 2):
-                if i + 1 < len(round_matches):
-                    match1 = round_matches[i]
-                    match2 = round_matches[i + 1]
-                    combined_match = {
-                        'team1': [match1.player1, match2.player1],  # A3 & A4
-                        'team2': [match1.player2, match2.player2],  # A5 & A6
-                        'score1': match1.score1,    # Combined scores
-                        'score2': match1.score2,
-                        'winner_player_id': match1.winner_player_id or match2.winner_player_id  # Winner logic
-                    }
-                    combined_matches.append(combined_match)
-            round_matches_list.append(combined_matches)
-        else:
-            # For non-football matches or other rounds, proceed as usual
-            round_matches_list.append(round_matches)
-        round_number += 1
+    # Load the whole bracket in one query, grouped by round
+    return render_match_view(match_info, manual_3places, load_bracket(match_id))
+
+def render_match_view(match_info, manual_3places, round_matches_list):
+    # Football round 1 is played in pairs, so combine the matches two by two
+    if "Football" in match_info.name and round_matches_list:
+        round_matches_list[0] = pair_football_round(round_matches_list[0])
 
     context = {
         'match_info': match_info,
@@ -214,6 +233,7 @@ def management_upload_ini(key):
         )
         db.session.add(new_match)
         db.session.commit()
+        data_changed('events')
         flash("Match initialized successfully!", "success")
         return redirect(f'/{key}/management/matches/all/')
 
@@ -240,6 +260,7 @@ def management_match_view(key, match_id):
             match_info.status = request.form['status']
 
         db.session.commit()
+        data_changed('events', f'event:{match_id}')
 
     # Fetch the top 3 players (manual rankings)
     manual_3places = [
@@ -248,30 +269,21 @@ def management_match_view(key, match_id):
         Players.query.get(match_info.manual_3rd_player_id)
     ]
 
-    # Fetch all matches for this match_info_id, grouped by round
-    round_matches_list = []
-    round_number = 1
-    while round_matches := Matches.query.filter_by(round=round_number, match_info_id=match_id).all():
-        round_matches_list.append(round_matches)
-        round_number += 1
+    # Fetch all matches for this match_info_id, grouped by round (players are loaded with them)
+    round_matches_list = load_bracket(match_id)
 
     # Prepare match details for the template
     match_details = []
     for round_matches in round_matches_list:
         round_details = []
         for match in round_matches:
-            # Fetch player names and winner
-            player1 = Players.query.get(match.player1_id)
-            player2 = Players.query.get(match.player2_id)
-            winner = Players.query.get(match.winner_player_id)
-
             round_details.append({
                 'match_id': match.id,
-                'player1': player1.name if player1 else 'TBD',
-                'player2': player2.name if player2 else 'TBD',
+                'player1': match.player1.name if match.player1 else 'TBD',
+                'player2': match.player2.name if match.player2 else 'TBD',
                 'score1': match.score1,
                 'score2': match.score2,
-                'winner': winner.name if winner else 'TBD',
+                'winner': match.winner_player.name if match.winner_player else 'TBD',
             })
         match_details.append(round_details)
 
@@ -294,40 +306,48 @@ def about():
     }
     return render_template('about.html', **context)
 
+def _timetable_vary():
+    # The default window follows the current day and the 'hours' window the clock
+    if request.args.get('hours'):
+        return datetime.now().strftime('%Y%m%d%H%M')
+    # Only an explicit ISO date gives a fixed window; 'today', an empty or an
+    # unparsable day all fall back to a window that depends on the date
+    try:
+        date.fromisoformat(request.args.get('day', ''))
+        return ''
+    except ValueError:
+        return date.today().isoformat()
+
 @bp.route('/timetable/')
+@cached_page('events', vary=_timetable_vary)
 def timetable():
-    matches = Match_info.query.order_by(Match_info.start_time).all()
+    # Days with events, counted by the database (no events are loaded for this)
+    days = timetable_days()
 
-    timetable_data = {}
-    for match in matches:
-        date = match.start_time.split(" ")[0]  
-        if date not in timetable_data:
-            timetable_data[date] = []
-        timetable_data[date].append(match)
+    hours = request.args.get('hours', type=int)
+    start, end, selected_day = timetable_range(days, request.args.get('day', ''), hours, datetime.now())
+    return render_timetable(days, selected_day, hours, timetable_window(start, end) if days else {})
 
+def render_timetable(days, selected_day, hours, timetable_data):
     context = {
         'route': 'timetable',
+        'days': days,
+        'selected_day': selected_day,
+        'hours': hours,
         'timetable_data': timetable_data,
     }
 
     return render_template('timetable.html', **context)
 
 @bp.route('/houses_status/')
+@cached_page('houses')
 def houses_status():
-    # Fetch all houses and sort them by points in descending order
-    houses = Houses.query.order_by(Houses.points.desc()).all()
+    # Fetch all houses sorted by points in descending order
+    return render_houses_status(house_standings())
 
-    # Prepare data for the template
-    house_rankings = []
-    color_map = {}
-
-    for index, house in enumerate(houses):
-        house_rankings.append({
-            'rank': index + 1,
-            'name': house.name,
-            'points': house.points,
-        })
-        color_map[house.name] = house.color  # Store house colors for styling
+def render_houses_status(house_rankings):
+    # Store house colors for styling
+    color_map = {house['name']: house['color'] for house in house_rankings}
 
     return render_template('houses_status.html', house_rankings=house_rankings, color_map=color_map)
 
@@ -336,9 +356,6 @@ def manage_players(key):
     if key != SECRET_KEY:
         return redirect('/home')
 
-    # Fetch all players from the database and sort by name
-    players = Players.query.order_by(Players.name.asc()).all()
-
     # Initialize the form for adding new players
     form = AddPlayerForm()
 
@@ -351,6 +368,8 @@ def manage_players(key):
             house_id2=form.house2.data
         )
         db.session.commit()
+        player_index.add(new_player)
+        data_changed('players')
         flash('Player added successfully!', 'success')
         return redirect(url_for('main.manage_players', key=key))
 
@@ -361,10 +380,51 @@ def manage_players(key):
         if player:
             db.session.delete(player)
             db.session.commit()
+            player_index.remove(player.id)
+            data_changed('players')
             flash('Player deleted successfully!', 'success')
         return redirect(url_for('main.manage_players', key=key))
 
-    return render_template('manage_players.html', players=players, form=form, key=key)
+    # One page of players by (name, id), optionally of one house only
+    house = request.args.get('house', '')
+    stmt = db.select(Players)
+    if house:
+        stmt = stmt.where(Players.house_id1 == house)
+    try:
+        players, next_cursor = keyset_page(stmt, [Players.name, Players.id], request.args.get('cursor'),
+                                           MANAGEMENT_PAGE_SIZE)
+    except ValueError:
+        return redirect(url_for('main.manage_players', key=key, house=house or None))
+
+    return render_template('manage_players.html', players=players, form=form, key=key,
+                           house=house, houses=house_cache.choices(), next_cursor=next_cursor,
+                           is_first_page=not request.args.get('cursor'))
+
+@bp.route('/<key>/management/players/import/', methods=['GET', 'POST'])
+def import_players(key):
+    if key != SECRET_KEY:
+        return redirect('/home')
+
+    report = error = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            error = 'Choose a CSV file to import.'
+        else:
+            # Read the upload as a text stream so large files are never held in memory
+            lines = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+            try:
+                report = import_players_csv(lines)
+            except (ValueError, csv.Error) as e:
+                # UnicodeDecodeError is a ValueError too
+                db.session.rollback()
+                error = f'Import stopped: {e}'
+            finally:
+                # Earlier batches may have been committed even if the import stopped
+                player_index.invalidate()
+                data_changed('players')
+
+    return render_template('import_players.html', key=key, report=report, error=error)
 
 @bp.route('/<key>/management/players/edit/<int:player_id>/', methods=['GET', 'POST'])
 def edit_player(key, player_id):
@@ -381,6 +441,8 @@ def edit_player(key, player_id):
         player.house_id2 = form.house2.data  
 
         db.session.commit()
+        player_index.update(player)
+        data_changed('players')
         flash('Player details updated successfully!', 'success')
         return redirect(f'/{key}/management/players/')  # Redirect to player list
 
@@ -433,46 +495,32 @@ def management_save_winner(key, match_id):
         third_place = Players.query.filter_by(name=form.third_place.data).first()
 
         if first_place and second_place and third_place:
+            # Points per placement come from the scoring rules of the event's
+            # category; nothing is saved when the event cannot be scored
+            try:
+                awards = placement_awards(match, [first_place, second_place, third_place])
+            except ValueError as e:
+                db.session.rollback()
+                flash(str(e), "error")
+                return redirect(f'/{key}/management/matches/all/{match_id}/win/')
+
             # Update match winners
             match.manual_1st_player_id = first_place.id
             match.manual_2nd_player_id = second_place.id
             match.manual_3rd_player_id = third_place.id
-            db.session.commit()
-            # Determine the event type and assign points
-            event_type = match.category  # Assuming 'category' field exists in Match_info
-            if event_type == 'Individual':
-                points = {'1st': 25, '2nd': 20, '3rd': 15}
-            elif event_type == 'Team':
-                points = {'1st': 50, '2nd': 45, '3rd': 40}
-            elif event_type == 'House':
-                points = {'1st': 75, '2nd': 65, '3rd': 55}
-            else:
-                flash("Invalid event type.", "error")
-                return redirect(f'/{key}/management/matches/all/{match_id}/win/')
 
-            # Function to calculate points with exception for B3 Baile and C5 Efie
-            def calculate_points(player, position):
-                house = player.house_id1  # Assuming house_id1 is the house of the player
-                base_points = points[position]
-                if house in ['B3', 'C5']:
-                    return int(base_points * 1.0)
-                return base_points
-
-            # Fetch houses for winners
-            first_place_house = Houses.query.filter_by(id=first_place.house_id1).first()
-            second_place_house = Houses.query.filter_by(id=second_place.house_id1).first()
-            third_place_house = Houses.query.filter_by(id=third_place.house_id1).first()
-
-            # Update house points for winners
-            if first_place_house:
-                first_place_house.points += calculate_points(first_place, '1st')
-            if second_place_house:
-                second_place_house.points += calculate_points(second_place, '2nd')
-            if third_place_house:
-                third_place_house.points += calculate_points(third_place, '3rd')
+            # Record the awards in the points ledger (updates the standings too);
+            # saving the winners again replaces the event's earlier awards
+            award_house_points(awards, match_info_id=match_id, replace=True)
 
-            # Commit changes to the database
+            # The places and their points are committed together
             db.session.commit()
+            # The events list (and /api/v1/events) shows the podium too
+            data_changed('events', f'event:{match_id}', 'houses')
+            live.publish(event_channel(match_id), 'podium', {
+                'places': [first_place.name, second_place.name, third_place.name],
+            })
+            live.publish(HOUSES_CHANNEL, 'standings', house_standings())
             flash("Winners and house points updated successfully!", "success")
             return redirect(f'/{key}/management/matches/all/{match_id}/')
         else:
@@ -480,12 +528,96 @@ def management_save_winner(key, match_id):
 
     return render_template('management_commit_winner.html', form=form, match=match, key=SECRET_KEY)
 
+# Server-Sent Events feeds for spectators (pushed by the management routes);
+# a reconnecting browser sends Last-Event-ID and gets what it missed
+def _live_response(channel):
+    stream = live.stream(channel, request.headers.get('Last-Event-ID'))
+    return Response(stream_with_context(stream), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@bp.route('/live/houses')
+def live_houses():
+    return _live_response(HOUSES_CHANNEL)
+
+@bp.route('/live/<int:match_info_id>')
+def live_event(match_info_id):
+    return _live_response(event_channel(match_info_id))
+
+# Read-only JSON API for the scoreboards (/api/v1/)
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+
+def _api_page(query, id_column, serialize):
+    # Keyset pagination on the ID column, with optional field selection
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
+    try:
+        limit = min(max(int(request.args.get('limit', API_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        if cursor:
+            query = query.filter(id_column > decode_cursor(cursor))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor.'}), 400
+
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return jsonify({
+        'data': [select_fields(serialize(row), fields) for row in rows[:limit]],
+        'next_cursor': next_cursor,
+    })
+
+@bp.route('/api/v1/events')
+@cached_page('events')
+def api_events():
+    query = Match_info.query
+    if request.args.get('status'):
+        query = query.filter(Match_info.status == request.args.get('status', type=int))
+    if request.args.get('category'):
+        query = query.filter(Match_info.category == request.args['category'])
+    return _api_page(query, Match_info.id, event_to_dict)
+
+@bp.route('/api/v1/events/<int:match_info_id>')
+@cached_page('events', 'event:{match_info_id}')
+def api_event(match_info_id):
+    match_info = Match_info.query.get(match_info_id)
+    if not match_info:
+        return jsonify({'error': 'Event not found.'}), 404
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
+    return jsonify(select_fields(event_to_dict(match_info), fields))
+
+@bp.route('/api/v1/events/<int:match_info_id>/bracket')
+@cached_page('event:{match_info_id}', 'players')
+def api_event_bracket(match_info_id):
+    if db.session.get(Match_info, match_info_id) is None:
+        return jsonify({'error': 'Event not found.'}), 404
+    rounds = load_bracket(match_info_id)
+    return jsonify({
+        'event_id': match_info_id,
+        'rounds': [
+            {'round': round_matches[0].round, 'matches': [match_to_dict(m) for m in round_matches]}
+            for round_matches in rounds
+        ],
+    })
+
+@bp.route('/api/v1/players')
+@cached_page('players')
+def api_players():
+    query = Players.query
+    if request.args.get('house'):
+        query = query.filter(Players.house_id1 == request.args['house'])
+    return _api_page(query, Players.id, player_to_dict)
+
+@bp.route('/api/v1/houses/standings')
+@cached_page('houses')
+def api_house_standings():
+    return jsonify(house_standings())
+
 # ✅ API route for player name autocomplete
 @bp.route('/autocomplete/players', methods=['GET'])
+@conditional('players')
 def autocomplete_players():
     query = request.args.get('q', '').strip()
-    players = Players.query.filter(Players.name.ilike(f"%{query}%")).limit(5).all()
-    return jsonify([player.name for player in players])
+    # Served from the in-memory name index, no database query per keystroke
+    return jsonify(player_index.search(query, limit=5))
 
 @bp.route('/<key>/management/matches/create/<int:match_info_id>/', methods=['GET', 'POST'])
 def create_matches(key, match_info_id):
@@ -499,12 +631,9 @@ def create_matches(key, match_info_id):
         participant_names = [name.strip() for name in form.participant_names.data.split(',')]
 
         try:
-            # Delete existing matches for this match_info_id
-            Matches.query.filter_by(match_info_id=match_info_id).delete()
-            db.session.commit()
-
-            # Create matches from participant names
+            # Replace the matches of this match_info_id with a new bracket
             create_matches_from_names(participant_names, info_id=match_info_id)
+            data_changed(f'event:{match_info_id}')
             flash("Matches created successfully!", "success")
         except ValueError as e:
             flash(str(e), "error")
@@ -521,6 +650,26 @@ def management_homepage(key):
         return redirect("/home")
     return render_template('management_home.html', key=key)
 
+@bp.route('/<key>/management/cache/')
+def management_cache_stats(key):
+    if key != SECRET_KEY:
+        return redirect("/home")
+    # Hit/miss counters of the public page cache
+    return jsonify(page_cache.stats())
+
+@bp.route('/<key>/management/profiling/', methods=['GET', 'POST'])
+def management_profiling(key):
+    if key != SECRET_KEY:
+        return redirect("/home")
+
+    # Clear the rolling window, e.g. before measuring a change
+    if request.method == 'POST':
+        profiler.reset()
+        return redirect(url_for('main.management_profiling', key=key))
+
+    return render_template('management_profiling.html', key=key, enabled=profiler.enabled,
+                           slow_query_ms=profiler.slow_query_ms, summary=profiler.summary())
+
 @bp.route("/<key>/management/house_rankings/", methods=["GET", "POST"])
 def house_rankings(key):
     if key != SECRET_KEY:
@@ -536,10 +685,12 @@ def house_rankings(key):
         form = forms.get(house_id)
 
         if form and form.validate_on_submit():
-            house = Houses.query.get(house_id)
+            house = house_cache.get(house_id)
             if house:
-                house.points = form.points.data
+                set_house_points(house.id, form.points.data)
                 db.session.commit()
+                data_changed('houses')
+                live.publish(HOUSES_CHANNEL, 'standings', house_standings())
                 flash(f"Updated points for {house.name}!", "success")
             else:
                 flash("House not found!", "danger")
@@ -548,6 +699,94 @@ def house_rankings(key):
 
     return render_template("management_house_rankings.html", key=key, houses=houses, forms=forms)
 
+@bp.route('/<key>/management/scoring/', methods=['GET', 'POST'])
+def management_scoring(key):
+    if key != SECRET_KEY:
+        return redirect('/home')
+
+    rules = ScoringRule.query.order_by(ScoringRule.category, ScoringRule.placement).all()
+    houses = Houses.query.order_by(Houses.id).all()
+    message = error = None
+
+    if request.method == 'POST':
+        if 'recompute' in request.form:
+            # Apply the current rules to every event retroactively
+            started = perf_counter()
+            written = recompute_standings()
+            db.session.commit()
+            data_changed('houses')
+            live.publish(HOUSES_CHANNEL, 'standings', house_standings())
+            message = f"Recomputed {written} awards in {(perf_counter() - started) * 1000:.0f} ms."
+        else:
+            try:
+                for rule in rules:
+                    rule.points = int(request.form[f'points-{rule.category}-{rule.placement}'])
+                for house in houses:
+                    house.multiplier = float(request.form[f'multiplier-{house.id}'])
+            except (KeyError, ValueError):
+                db.session.rollback()
+                error = "Points must be whole numbers and multipliers numbers."
+            else:
+                db.session.commit()
+                data_changed('houses')
+                message = "Scoring rules saved. Recompute the standings to apply them to past events."
+
+    categories = {}
+    for rule in rules:
+        categories.setdefault(rule.category, []).append(rule)
+    return render_template('management_scoring.html', key=key, categories=categories, houses=houses,
+                           message=message, error=error)
+
+@bp.route('/<key>/management/matches/all/<int:match_info_id>/batch/', methods=['GET', 'POST'])
+def management_batch_scores(key, match_info_id):
+    if key != SECRET_KEY:
+        return redirect('/home')
+
+    match_info = Match_info.query.get_or_404(match_info_id)
+
+    summary = error = None
+    if request.method == 'POST':
+        if request.is_json:
+            # Either a list of rows or {"results": [...]}
+            payload = request.get_json(silent=True)
+            results = payload.get('results', []) if isinstance(payload, dict) else payload or []
+        else:
+            # One row of the grid per match ID
+            results = [
+                {
+                    'match_id': match_id,
+                    'score1': request.form.get(f'score1-{match_id}'),
+                    'score2': request.form.get(f'score2-{match_id}'),
+                    'winner': request.form.get(f'winner-{match_id}'),
+                }
+                for match_id in request.form.getlist('match_id')
+            ]
+
+        try:
+            updated, changed = apply_match_results(match_info_id, results)
+            db.session.commit()
+        except ValueError as e:
+            db.session.rollback()
+            error = str(e)
+            if request.is_json:
+                return jsonify({'error': error.splitlines()}), 400
+        else:
+            if changed:
+                data_changed(f'event:{match_info_id}')
+                live.publish(event_channel(match_info_id), 'matches', [match_to_dict(m) for m in changed])
+            summary = {'submitted': len(results), 'updated': updated, 'propagated': len(changed) - updated}
+            if request.is_json:
+                return jsonify(summary)
+
+    context = {
+        'match_info': match_info,
+        'rounds': load_bracket(match_info_id),
+        'summary': summary,
+        'error': error,
+        'key': key,
+    }
+    return render_template('management_batch_scores.html', **context)
+
 @bp.route('/<key>/management/matches/all/<int:match_info_id>/<int:match_id>/', methods=['GET', 'POST'])
 def management_upload_scores(key, match_info_id, match_id):
     if key != SECRET_KEY:
@@ -563,29 +802,15 @@ def management_upload_scores(key, match_info_id, match_id):
 
     if form.validate_on_submit():
         try:
-            # Update match scores and winner
-            current_match.score1 = form.score1.data
-            current_match.score2 = form.score2.data
-            current_match.winner_player_id = form.winner.data
-
-            # Propagate the winner to the next round (for Rounds 1 and 2)
-            if current_match.round in [1, 2]:
-                next_round = current_match.round + 1
-                next_matches = Matches.query.filter(
-                    (Matches.last_match1_id == match_id) | (Matches.last_match2_id == match_id),
-                    Matches.round == next_round,
-                    Matches.match_info_id == match_info_id
-                )
-
-                # if next_matches:
-                for next_match in next_matches:
-                    if next_match.last_match1_id == match_id:
-                        next_match.player1_id = current_match.winner_player_id
-                    elif next_match.last_match2_id == match_id:
-                        next_match.player2_id = current_match.winner_player_id
+            # Record the result and carry the winner through the later rounds
+            graph = load_bracket_graph(match_info_id)
+            graph.set_result(match_id, form.score1.data, form.score2.data, form.winner.data)
+            changed_matches = list(graph.changed.values())
 
             # Commit changes to the database
             db.session.commit()
+            data_changed(f'event:{match_info_id}')
+            live.publish(event_channel(match_info_id), 'matches', [match_to_dict(m) for m in changed_matches])
             flash("Scores updated successfully!", "success")
         except Exception as e:
             flash(f"An error occurred: {str(e)}", "error")
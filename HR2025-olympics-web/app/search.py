@@ -0,0 +1,201 @@
+import bisect
+import heapq
+from threading import RLock
+from .cache import data_versions
+
+
+class PlayerNameIndex:
+    """
+    In-memory n-gram index over player names for the autocomplete endpoint.
+
+    A sorted list of names answers prefix lookups with a binary search. For
+    substrings every name is broken into its 1-, 2- and 3-grams; a lookup
+    intersects the posting sets of the query's grams and only checks the
+    candidates that survive, so no database query is needed per keystroke. The index is built
+    lazily from the Players table and kept up to date by the management routes
+    through add(), update() and remove().
+
+    The index remembers the 'players' data version it reflects and is built
+    again once the version moves on, so a change made by another server
+    process shows up too. A change this process made itself, through the
+    methods above, is already in the index and does not cause a rebuild.
+    """
+
+    GRAM = 3
+
+    def __init__(self):
+        self._lock = RLock()
+        self._players = {}  # id -> (name, lowered name, house ids)
+        self._grams = {}  # gram -> set of player ids
+        self._houses = {}  # lowered house id -> set of player ids
+        self._sorted = []  # (lowered name, id, name), kept sorted for prefix lookups
+        self._built = False
+        self._version = None
+
+    @classmethod
+    def _grams_of(cls, text):
+        grams = set()
+        for n in range(1, cls.GRAM + 1):
+            for i in range(len(text) - n + 1):
+                grams.add(text[i:i + n])
+        return grams
+
+    def build(self, players, version=None):
+        # Replaces the whole index; every structure is cleared, the sorted
+        # name list included, so a rebuild (e.g. after a CSV import) neither
+        # duplicates prefix matches nor keeps deleted names
+        with self._lock:
+            self._players.clear()
+            self._grams.clear()
+            self._houses.clear()
+            self._sorted.clear()
+            for player in players:
+                self._add(player, keep_sorted=False)
+            self._sorted.sort()
+            self._built = True
+            self._version = version
+
+    @property
+    def current(self):
+        # Whether the index reflects the current 'players' data version; one
+        # built from a given list without a version is kept as it is
+        if not self._built:
+            return False
+        return self._version is None or self._version == data_versions.get('players')[0]
+
+    def invalidate(self):
+        # Force a rebuild from the database on the next lookup
+        with self._lock:
+            self._built = False
+
+    def advance(self, previous, version):
+        # The 'players' version was bumped by this process after it changed
+        # the index itself: unless someone else changed players in between,
+        # the index is still complete
+        with self._lock:
+            if self._built and self._version == previous:
+                self._version = version
+
+    def _ensure_built(self):
+        if not self.current:
+            from .models import Players
+            self.build(Players.query.all(), data_versions.get('players')[0])
+
+    def _add(self, player, keep_sorted=True):
+        lowered = (player.name or '').lower()
+        houses = tuple(h.lower() for h in (player.house_id1, player.house_id2) if h and h != '0')
+        self._players[player.id] = (player.name, lowered, houses)
+        if keep_sorted:
+            bisect.insort(self._sorted, (lowered, player.id, player.name))
+        else:
+            self._sorted.append((lowered, player.id, player.name))
+        for gram in self._grams_of(lowered):
+            self._grams.setdefault(gram, set()).add(player.id)
+        for house in houses:
+            self._houses.setdefault(house, set()).add(player.id)
+
+    def _remove(self, player_id):
+        entry = self._players.pop(player_id, None)
+        if entry is None:
+            return
+        name, lowered, houses = entry
+        i = bisect.bisect_left(self._sorted, (lowered, player_id, name))
+        if i < len(self._sorted) and self._sorted[i][1] == player_id:
+            del self._sorted[i]
+        for gram in self._grams_of(lowered):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(player_id)
+                if not ids:
+                    del self._grams[gram]
+        for house in houses:
+            ids = self._houses.get(house)
+            if ids is not None:
+                ids.discard(player_id)
+                if not ids:
+                    del self._houses[house]
+
+    def add(self, player):
+        with self._lock:
+            if self._built:
+                self._add(player)
+
+    def update(self, player):
+        with self._lock:
+            if self._built:
+                self._remove(player.id)
+                self._add(player)
+
+    def remove(self, player_id):
+        with self._lock:
+            if self._built:
+                self._remove(player_id)
+
+    def _candidates(self, q):
+        # Intersect the posting sets of the query's longest grams, smallest first
+        n = min(len(q), self.GRAM)
+        postings = [self._grams.get(q[i:i + n], set()) for i in range(len(q) - n + 1)]
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates &= ids
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query, limit=5):
+        """
+        Find players whose name contains the query, best matches first.
+
+        Ranking: exact name, name prefix, prefix of a later word in the name,
+        house ID match, then any other substring; ties are broken by name.
+
+        Args:
+            query (str): Text typed by the user (case-insensitive).
+            limit (int): Maximum number of names returned.
+
+        Returns:
+            list: Player names.
+        """
+        q = query.strip().lower()
+        with self._lock:
+            self._ensure_built()
+            # Enough names start with the query: they already are the best matches, in order
+            start = bisect.bisect_left(self._sorted, (q,))
+            prefixed = []
+            for lowered, _, name in self._sorted[start:start + limit]:
+                if not lowered.startswith(q):
+                    break
+                prefixed.append(name)
+            if len(prefixed) == limit or not q:
+                return prefixed
+
+            ranked = []
+            for player_id in self._candidates(q):
+                name, lowered, houses = self._players[player_id]
+                if q not in lowered:
+                    continue
+                if lowered == q:
+                    rank = 0
+                elif lowered.startswith(q):
+                    rank = 1
+                elif any(word.startswith(q) for word in lowered.split()[1:]):
+                    rank = 2
+                elif q in houses:
+                    rank = 3
+                else:
+                    rank = 4
+                ranked.append((rank, lowered, name))
+
+            # Players of a house whose ID was typed, even if the name does not contain it
+            matched = {name for _, _, name in ranked}
+            for player_id in self._houses.get(q, ()):
+                name, lowered, _ = self._players[player_id]
+                if name not in matched:
+                    ranked.append((3, lowered, name))
+
+        return [name for _, _, name in heapq.nsmallest(limit, ranked)]
+
+
+player_index = PlayerNameIndex()
+data_versions.on_change('players', player_index.advance)
@@ -1,147 +1,901 @@
-from .models import db, Matches, Players
+import base64
+import csv
+import json
+from datetime import datetime, date, timedelta
+from itertools import groupby
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload
+from .bracket import BracketGraph
+from .cache import house_cache
+from .models import db, Match_info, Matches, Players, Houses, HousePointsLedger, HouseStandings, ScoringRule
 
-def rnd02infinite(previous_matches_ids, rnd, info_id, start_id):
+def events_select():
+    # Every event, running ones first (home page)
+    return db.select(Match_info).order_by(Match_info.status.desc())
+
+def bracket_select(info_id):
+    # Rounds 1 and up of an event with the players joined in (sync and async readers)
+    return (
+        db.select(Matches)
+        .options(
+            joinedload(Matches.player1),
+            joinedload(Matches.player2),
+            joinedload(Matches.winner_player),
+        )
+        .where(Matches.match_info_id == info_id, Matches.round >= 1)
+        .order_by(Matches.round, Matches.id)
+    )
+
+def group_rounds(matches):
+    # Split matches ordered by round into one list per round
+    return [list(round_matches) for _, round_matches in groupby(matches, key=lambda m: m.round)]
+
+def load_bracket(info_id):
     """
-    Create matches in pairs from a list of participant IDs.
+    Load every match of an event with its players in a single query.
 
     Args:
-        previous_matches_ids (list): List of match IDs from the previous round.
-        rnd (int): The current round number.
-        info_id (int): The ID of the match info this match belongs to.
-        start_id (int): The starting match ID for this set of matches.
+        info_id (int): The ID of the match info the bracket belongs to.
 
     Returns:
-        int: The last unpaired participant ID if the number of participants is odd.
+        list: One list of matches per round, starting at round 1. Round 0
+        (the seeding rows) is not included.
     """
-    match = None
+    return group_rounds(db.session.scalars(bracket_select(info_id)).all())
 
-    for i, match_id in enumerate(previous_matches_ids):
-        if i % 2 == 0:
-            # Create a new match and set the first player
-            match = Matches()
-            match.last_match1_id = match_id
-            match.player1_id = Matches.query.get(match_id).winner_player_id  # Set player1_id to the winner of last_match1
-        else:
-            # Set the second player and save the match
-            match.last_match2_id = match_id
-            match.player2_id = Matches.query.get(match_id).winner_player_id  # Set player2_id to the winner of last_match2
-            match.match_info_id = info_id
-            match.score1 = 0
-            match.score2 = 0
-            match.round = rnd
-            db.session.add(match)
-            match = None  # Reset for the next match
+def load_bracket_graph(info_id):
+    """
+    Load an event's bracket (one query) as a BracketGraph for updating results.
 
-    db.session.commit()
+    Args:
+        info_id (int): The ID of the match info the bracket belongs to.
+
+    Returns:
+        BracketGraph: Graph over the matches of rounds 1 and up.
+    """
+    return BracketGraph(match for round_matches in load_bracket(info_id) for match in round_matches)
+
+def pair_football_round(round_matches):
+    """
+    Combine the matches of a football round in pairs (two houses per team).
+
+    Args:
+        round_matches (list): Matches of the round, as returned by load_bracket.
+
+    Returns:
+        list: One dict per pair with team1, team2, score1, score2 and winner_player_id.
+    """
+    combined_matches = []
+    for i in range(0, len(round_matches) - 1, 2):
+        match1 = round_matches[i]
+        match2 = round_matches[i + 1]
+        combined_matches.append({
+            'id': match1.id,
+            'team1': [match1.player1, match2.player1],
+            'team2': [match1.player2, match2.player2],
+            'score1': match1.score1,
+            'score2': match1.score2,
+            'winner_player_id': match1.winner_player_id or match2.winner_player_id
+        })
+    return combined_matches
+
+def _rerank(standings):
+    # Leaderboard order: most points first, ties broken by house ID
+    for index, row in enumerate(sorted(standings, key=lambda r: (-r.points, r.house_id))):
+        row.rank = index + 1
+
+def rebuild_standings(open_ledger=True):
+    """
+    Rebuild the materialized standings from the points ledger.
+
+    The totals come from one aggregate query over the ledger. A ledger that
+    is still empty is first opened with each house's current points, so
+    databases created before the ledger existed keep their totals.
+
+    Args:
+        open_ledger (bool): Set to False when the ledger was just rebuilt and
+            may legitimately be empty.
+    """
+    if open_ledger and not db.session.query(HousePointsLedger.id).first():
+        for house in Houses.query.filter(Houses.points != 0):
+            db.session.add(HousePointsLedger(house_id=house.id, points=house.points))
+        db.session.flush()
+
+    totals = db.session.execute(
+        db.select(Houses, db.func.coalesce(db.func.sum(HousePointsLedger.points), 0))
+        .outerjoin(HousePointsLedger, HousePointsLedger.house_id == Houses.id)
+        .group_by(Houses.id)
+    ).all()
+
+    HouseStandings.query.delete()
+    standings = []
+    for house, points in totals:
+        house.points = points
+        standings.append(HouseStandings(house_id=house.id, points=points))
+    _rerank(standings)
+    db.session.add_all(standings)
+    db.session.flush()
+    return standings
+
+def settle_opening_balance(match_info_ids=None):
+    """
+    Itemize the event awards hidden in the ledger's opening balance.
+
+    Events won before the ledger existed only have their points inside the
+    opening entries. For each such event (manual places, no ledger entries)
+    the placements are recorded with the points the old winners form gave,
+    the default rules without multiplier, together with an adjustment for
+    the event that takes them off again. The totals stay the same, and the
+    placement entries can then be replaced without counting the event twice.
+    The caller commits.
+
+    Args:
+        match_info_ids (list): Only settle these events; all when None.
+
+    Returns:
+        int: Number of events settled.
+    """
+    opening = db.session.query(HousePointsLedger.id).filter(
+        HousePointsLedger.match_info_id.is_(None), HousePointsLedger.placement.is_(None)
+    ).first()
+    if opening is None:
+        return 0
+
+    query = Match_info.query.filter(
+        Match_info.manual_1st_player_id.isnot(None),
+        ~db.exists().where(HousePointsLedger.match_info_id == Match_info.id),
+    )
+    if match_info_ids is not None:
+        query = query.filter(Match_info.id.in_(match_info_ids))
+    events = query.all()
+    if not events:
+        return 0
+
+    player_ids = {
+        player_id for event in events
+        for player_id in (event.manual_1st_player_id, event.manual_2nd_player_id, event.manual_3rd_player_id)
+        if player_id is not None
+    }
+    houses = dict(db.session.execute(
+        db.select(Players.id, Players.house_id1)
+        .join(Houses, Houses.id == Players.house_id1)
+        .where(Players.id.in_(player_ids))
+    ).all())
+
+    settled = 0
+    for event in events:
+        points = ScoringRule.DEFAULT_POINTS.get(event.category)
+        if points is None:
+            # The old form awarded nothing for other categories
+            continue
+        withdrawn = {}
+        placements = (event.manual_1st_player_id, event.manual_2nd_player_id, event.manual_3rd_player_id)
+        for placement, player_id in enumerate(placements, start=1):
+            house_id = houses.get(player_id)
+            if house_id is None:
+                continue
+            db.session.add(HousePointsLedger(
+                house_id=house_id, match_info_id=event.id, placement=placement, points=points[placement - 1]
+            ))
+            withdrawn[house_id] = withdrawn.get(house_id, 0) - points[placement - 1]
+        for house_id, total in withdrawn.items():
+            db.session.add(HousePointsLedger(house_id=house_id, match_info_id=event.id, points=total))
+        settled += 1
+    db.session.flush()
+    return settled
+
+def award_house_points(awards, match_info_id=None, replace=False):
+    """
+    Record points in the ledger and update the standings incrementally.
+
+    Args:
+        awards (list): (house_id, points, placement) tuples; placement is None
+            for manual adjustments.
+        match_info_id (int): The event the points are awarded for, if any.
+        replace (bool): Withdraw the placement points previously awarded for
+            this event first, so saving the winners again does not count twice.
+
+    Raises:
+        ValueError: If an award names a house that does not exist.
+
+    The caller commits.
+    """
+    standings = {row.house_id: row for row in HouseStandings.query.all()}
+    if not standings:
+        standings = {row.house_id: row for row in rebuild_standings()}
+
+    # A house added after the standings were built gets its row now
+    for house_id in {house_id for house_id, _, _ in awards} - set(standings):
+        house = db.session.get(Houses, house_id)
+        if house is None:
+            raise ValueError(f"Unknown house '{house_id}'.")
+        total = db.session.scalar(
+            db.select(db.func.coalesce(db.func.sum(HousePointsLedger.points), 0))
+            .where(HousePointsLedger.house_id == house_id)
+        )
+        row = HouseStandings(house_id=house_id, house=house, points=total, rank=len(standings) + 1)
+        db.session.add(row)
+        standings[house_id] = row
+
+    if replace and match_info_id is not None:
+        settle_opening_balance([match_info_id])
+        previous = HousePointsLedger.query.filter(
+            HousePointsLedger.match_info_id == match_info_id,
+            HousePointsLedger.placement.isnot(None),
+        )
+        for entry in previous:
+            row = standings.get(entry.house_id)
+            if row is not None:
+                row.points -= entry.points
+                row.house.points = row.points
+            db.session.delete(entry)
+
+    for house_id, points, placement in awards:
+        row = standings[house_id]
+        db.session.add(HousePointsLedger(
+            house_id=house_id, match_info_id=match_info_id, placement=placement, points=points
+        ))
+        row.points += points
+        # Houses.points mirrors the standings for the management forms
+        row.house.points = row.points
+    _rerank(standings.values())
+
+def withdraw_event_points(match_info_id):
+    """
+    Take an event's placement points off the standings before it is deleted.
+
+    The event's ledger entries are removed, so nothing references it any
+    more. An adjustment recorded for it by settle_opening_balance is kept as
+    a plain adjustment: it takes the event's share back out of the opening
+    balance. The caller commits, together with the delete.
+
+    Returns:
+        bool: True if the standings changed.
+    """
+    settle_opening_balance([match_info_id])
+    entries = HousePointsLedger.query.filter(HousePointsLedger.match_info_id == match_info_id).all()
+    if not entries:
+        return False
+
+    standings = {row.house_id: row for row in HouseStandings.query.all()}
+    for entry in entries:
+        if entry.placement is None:
+            entry.match_info_id = None
+            continue
+        row = standings.get(entry.house_id)
+        if row is not None:
+            row.points -= entry.points
+            row.house.points = row.points
+        db.session.delete(entry)
+    _rerank(standings.values())
+    return True
+
+def set_house_points(house_id, points):
+    # Manual override: recorded as an adjustment of the difference
+    row = HouseStandings.query.get(house_id) or next(
+        (r for r in rebuild_standings() if r.house_id == house_id), None
+    )
+    if row is not None and points != row.points:
+        award_house_points([(house_id, points - row.points, None)])
+
+def placement_points(category):
+    """
+    Points per placement for an event category, before house multipliers.
+
+    Returns:
+        dict: placement -> points; empty if the category has no rules.
+    """
+    return dict(db.session.execute(
+        db.select(ScoringRule.placement, ScoringRule.points).where(ScoringRule.category == category)
+    ).all())
+
+def placement_awards(match_info, players):
+    """
+    Turn an event's podium into ledger awards using the scoring rules.
+
+    Args:
+        match_info (Match_info): The event, for its category.
+        players (list): The players placed 1st, 2nd, 3rd, ...
+
+    Returns:
+        list: (house_id, points, placement) tuples for award_house_points.
+
+    Raises:
+        ValueError: If there are no scoring rules for the event's category.
+    """
+    rules = placement_points(match_info.category)
+    if not rules:
+        raise ValueError(f"No scoring rules for category '{match_info.category}'.")
+    awards = []
+    for placement, player in enumerate(players, start=1):
+        house = house_cache.get(player.house_id1)
+        if placement in rules and house is not None:
+            # Rounded half up, like ROUND() in recompute_standings
+            awards.append((house.id, int(rules[placement] * house.multiplier + 0.5), placement))
+    return awards
+
+def recompute_standings():
+    """
+    Recompute every event award from the current scoring rules.
+
+    All placement entries are dropped from the ledger and written again by a
+    single INSERT ... SELECT over the manual placements of every event, then
+    the standings are rebuilt from the ledger. Manual adjustments stay as they
+    are; awards still inside the opening balance are itemized first (see
+    settle_opening_balance), so they are replaced rather than added to. The
+    caller commits.
+
+    Returns:
+        int: Number of awards written.
+    """
+    placements = db.union_all(*(
+        db.select(
+            Match_info.id.label('match_info_id'),
+            db.literal(placement).label('placement'),
+            column.label('player_id'),
+            Match_info.category.label('category'),
+        ).where(column.isnot(None))
+        for placement, column in enumerate(
+            (Match_info.manual_1st_player_id, Match_info.manual_2nd_player_id, Match_info.manual_3rd_player_id),
+            start=1,
+        )
+    )).subquery()
+
+    awards = (
+        db.select(
+            Houses.id,
+            placements.c.match_info_id,
+            placements.c.placement,
+            db.cast(db.func.round(ScoringRule.points * Houses.multiplier), db.Integer),
+            db.literal(datetime.utcnow()),
+        )
+        .join(Players, Players.id == placements.c.player_id)
+        .join(Houses, Houses.id == Players.house_id1)
+        .join(ScoringRule, db.and_(
+            ScoringRule.category == placements.c.category,
+            ScoringRule.placement == placements.c.placement,
+        ))
+    )
+
+    settle_opening_balance()
+    HousePointsLedger.query.filter(HousePointsLedger.placement.isnot(None)).delete()
+    written = db.session.execute(
+        db.insert(HousePointsLedger).from_select(
+            ['house_id', 'match_info_id', 'placement', 'points', 'created_at'], awards
+        )
+    ).rowcount
+    rebuild_standings(open_ledger=False)
+    return written
+
+def standings_select():
+    # The materialized leaderboard with the houses joined in, leader first
+    return db.select(HouseStandings).order_by(HouseStandings.rank)
+
+def standings_to_dicts(standings):
+    return [
+        {'rank': row.rank, 'id': row.house_id, 'name': row.house.name, 'color': row.house.color, 'points': row.points}
+        for row in standings
+    ]
+
+def house_standings():
+    """
+    Read the house leaderboard, highest points first.
+
+    The standings are materialized by the migration and by `flask bootstrap`,
+    so a read never writes. Should the table still be empty, the leaderboard
+    is ranked from the houses' own totals instead.
+
+    Returns:
+        list: One dict per house with rank, id, name, color and points.
+    """
+    standings = db.session.scalars(standings_select()).all()
+    if standings:
+        return standings_to_dicts(standings)
+    houses = db.session.scalars(db.select(Houses).order_by(Houses.points.desc(), Houses.id)).all()
+    return [
+        {'rank': rank, 'id': house.id, 'name': house.name, 'color': house.color, 'points': house.points or 0}
+        for rank, house in enumerate(houses, start=1)
+    ]
+
+def match_to_dict(match):
+    """
+    Compact, JSON-serializable view of a single bracket match.
+
+    Args:
+        match (Matches): The match to serialize.
+
+    Returns:
+        dict: Match ID, round, player names, scores and winner.
+    """
+    return {
+        'id': match.id,
+        'round': match.round,
+        'player1': match.player1.name if match.player1 else None,
+        'player2': match.player2.name if match.player2 else None,
+        'score1': match.score1,
+        'score2': match.score2,
+        'winner_player_id': match.winner_player_id,
+        'winner': match.winner_player.name if match.winner_player else None,
+    }
+
+def event_to_dict(info):
+    # Compact, JSON-serializable view of a Match_info row
+    return {
+        'id': info.id,
+        'name': info.name,
+        'category': info.category,
+        'status': info.status,
+        'start_time': info.start_time.isoformat() if info.start_time else None,
+        'end_time': info.end_time.isoformat() if info.end_time else None,
+        'description': info.description,
+        'hex_icon': info.hex_icon,
+        'pair_id': info.pair_id,
+        'places': [info.manual_1st_player_id, info.manual_2nd_player_id, info.manual_3rd_player_id],
+    }
+
+def player_to_dict(player):
+    # Compact, JSON-serializable view of a Players row
+    return {
+        'id': player.id,
+        'name': player.name,
+        'medals': player.medals,
+        'house_id1': player.house_id1,
+        'house_id2': player.house_id2,
+    }
 
-    # If there's an odd number of participants, return the last player ID
-    if match is not None:
-        return previous_matches_ids[-1]
+def select_fields(item, fields):
+    # Keep only the requested keys (all of them when no field list was given)
+    if not fields:
+        return item
+    return {name: item[name] for name in fields if name in item}
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode a pagination cursor back to the last ID of the previous page.
+
+    Raises:
+        ValueError: If the cursor was not produced by encode_cursor.
+    """
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return int(base64.urlsafe_b64decode(padded.encode()).decode())
+
+def keyset_page(stmt, columns, cursor=None, limit=50, descending=False):
+    """
+    One page of a select in keyset (seek) order, continuing after a cursor.
+
+    The rows are ordered by the columns, all ascending or all descending,
+    and the page starts with a row comparison against the last row of the
+    previous page instead of an OFFSET, so with an index on the columns
+    every page costs the same however deep it is. The last column must be
+    unique (the primary key) so that no two rows share a position.
+
+    Args:
+        stmt (Select): The select to page through, filters applied.
+        columns (list): The columns to order by, e.g. [Players.name, Players.id].
+        cursor (str): The next_cursor of the previous page, or None for the first.
+        limit (int): Rows per page.
+        descending (bool): Whether to order from the highest key down.
+
+    Returns:
+        tuple: (rows, next_cursor), next_cursor being None on the last page.
+
+    Raises:
+        ValueError: If the cursor was not produced by this function, or its
+            values do not fit the columns.
+    """
+    if cursor:
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            after = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+        if not isinstance(after, list) or len(after) != len(columns):
+            raise ValueError("Invalid cursor: wrong number of values")
+        for value, column in zip(after, columns):
+            # A forged cursor must not reach the database with, say, a dict
+            if value is not None and (isinstance(value, bool) or not isinstance(value, column.type.python_type)):
+                raise ValueError(f"Invalid cursor: bad value for {column.key}")
+        key = tuple_(*columns)
+        stmt = stmt.where(key < tuple_(*after) if descending else key > tuple_(*after))
+
+    stmt = stmt.order_by(*(column.desc() if descending else column for column in columns))
+    rows = db.session.scalars(stmt.limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    last = rows[limit - 1]
+    values = [getattr(last, column.key) for column in columns]
+    return rows[:limit], base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+def event_progress(info_ids):
+    """
+    Winner and bracket progress of several events, in one grouped query.
+
+    The events are joined with their 1st place player and their matches of
+    rounds 1 and up, and grouped by event and round, so the cost does not
+    depend on how many events or matches there are.
+
+    Args:
+        info_ids (list): IDs of the events.
+
+    Returns:
+        dict: Event ID -> {'winner': name or None, 'rounds': list of
+        (round, decided, total)}, rounds in order. A match is decided once
+        it has a winner.
+    """
+    rows = db.session.execute(
+        db.select(
+            Match_info.id, Players.name, Matches.round,
+            db.func.count(Matches.id), db.func.count(Matches.winner_player_id),
+        )
+        .outerjoin(Players, Players.id == Match_info.manual_1st_player_id)
+        .outerjoin(Matches, db.and_(Matches.match_info_id == Match_info.id, Matches.round >= 1))
+        .where(Match_info.id.in_(info_ids))
+        .group_by(Match_info.id, Players.name, Matches.round)
+        .order_by(Match_info.id, Matches.round)
+    )
+    progress = {}
+    for info_id, winner, round_, total, decided in rows:
+        event = progress.setdefault(info_id, {'winner': winner, 'rounds': []})
+        if round_ is not None:
+            event['rounds'].append((round_, decided, total))
+    return progress
+
+def parse_datetime(text):
+    """
+    Parse a date and time typed in a form or sent by a datetime-local input.
+
+    Raises:
+        ValueError: If the text is not in a supported format.
+    """
+    for fmt in ('%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S'):
+        try:
+            return datetime.strptime(text.strip(), fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date and time '{text}', expected YYYY-MM-DD HH:MM.")
+
+def timetable_days_select():
+    day = db.func.date(Match_info.start_time)
+    return db.select(day, db.func.count()).where(Match_info.start_time.isnot(None)).group_by(day).order_by(day)
+
+def day_counts(rows):
+    # SQLite returns date() as text, MySQL as a date
+    return [(value if isinstance(value, date) else date.fromisoformat(value), count) for value, count in rows]
+
+def timetable_days():
+    """
+    List the days that have events, with the number of events on each day.
+
+    The grouping is done by the database in one aggregate query.
+
+    Returns:
+        list: (date, count) tuples in chronological order.
+    """
+    return day_counts(db.session.execute(timetable_days_select()).all())
+
+def timetable_window_select(start, end):
+    return (
+        db.select(Match_info)
+        .where(Match_info.start_time >= start, Match_info.start_time < end)
+        .order_by(Match_info.start_time, Match_info.id)
+    )
+
+def group_by_day(events):
+    return {day: list(day_events) for day, day_events in groupby(events, key=lambda e: e.start_time.date())}
+
+def timetable_window(start, end):
+    """
+    Load the events starting in [start, end), grouped by day.
+
+    Args:
+        start (datetime): Start of the window (inclusive).
+        end (datetime): End of the window (exclusive).
+
+    Returns:
+        dict: Day (date) -> list of Match_info, in chronological order.
+    """
+    return group_by_day(db.session.scalars(timetable_window_select(start, end)).all())
+
+# Longest next-N-hours window of the timetable: two weeks
+TIMETABLE_MAX_HOURS = 24 * 14
+
+def timetable_range(days, day_arg, hours, now):
+    """
+    Work out which window of the timetable to show.
+
+    Args:
+        days (list): (date, count) tuples from timetable_days().
+        day_arg (str): The 'day' query argument: 'today', an ISO date or ''.
+        hours (int): The 'hours' query argument, or None; clamped to
+            1..TIMETABLE_MAX_HOURS.
+        now (datetime): The current time.
+
+    Returns:
+        tuple: (start, end, selected_day); selected_day is None for the
+        next-N-hours window.
+    """
+    if hours:
+        # Events starting in the next N hours; a huge N would overflow datetime
+        hours = min(max(hours, 1), TIMETABLE_MAX_HOURS)
+        return now, now + timedelta(hours=hours), None
+    try:
+        selected_day = now.date() if day_arg == 'today' else date.fromisoformat(day_arg)
+    except ValueError:
+        # Default: today, or the next day with events, or the last one
+        upcoming = [day for day, _ in days if day >= now.date()]
+        selected_day = upcoming[0] if upcoming else (days[-1][0] if days else now.date())
+    start = datetime.combine(selected_day, datetime.min.time())
+    return start, start + timedelta(days=1), selected_day
+
+def build_bracket(player_ids):
+    """
+    Build a whole bracket in memory for any number of participants.
+
+    Round 0 holds one seeding row per participant (its winner is the
+    participant). Each following round pairs the survivors of the previous
+    one; with an odd count the last survivor gets a bye and is carried to the
+    front of the next round, so the same entrant never gets two byes in a row.
+    When three survivors are left the event ends with the three-way final
+    (1 v 2, 2 v 3, 1 v 3); with two left it ends with a single final.
+
+    Args:
+        player_ids (list): Participant player IDs, in seeding order.
+
+    Returns:
+        list: One dict per match with round, player1_id, player2_id,
+        winner_player_id, and last_match1/last_match2 as indexes into the list.
+    """
+    rows = []
+
+    def add(rnd, last1=None, last2=None, winner=None):
+        rows.append({
+            'round': rnd,
+            'player1_id': rows[last1]['winner_player_id'] if last1 is not None else None,
+            'player2_id': rows[last2]['winner_player_id'] if last2 is not None else None,
+            'winner_player_id': winner,
+            'last_match1': last1,
+            'last_match2': last2,
+        })
+        return len(rows) - 1
+
+    # Round 0: one seeding row per participant
+    survivors = [add(0, winner=player_id) for player_id in player_ids]
+
+    rnd = 1
+    while len(survivors) > 3:
+        next_survivors = [add(rnd, survivors[i], survivors[i + 1]) for i in range(0, len(survivors) - 1, 2)]
+        if len(survivors) % 2:
+            # Bye: the unpaired survivor goes straight to the next round
+            next_survivors.insert(0, survivors[-1])
+        survivors = next_survivors
+        rnd += 1
+
+    if len(survivors) == 3:
+        first, second, third = survivors
+        add(rnd, first, second)
+        add(rnd, second, third)
+        add(rnd, first, third)
+    elif len(survivors) == 2:
+        add(rnd, survivors[0], survivors[1])
+
+    return rows
 
 def create_matches_from_names(participant_names, info_id):
     """
-    Create matches from a list of participant names.
+    Create the bracket of an event from a list of participant names.
+
+    All names are resolved with one query and the bracket is written with
+    one INSERT per round, in a single transaction that also removes the previous
+    bracket of the event.
 
     Args:
         participant_names (list): List of participant names.
         info_id (int): The ID of the match info this match belongs to.
     """
-    # Fetch player IDs based on their names
+    # Resolve every name in one query; with duplicate names the oldest player wins
+    players_by_name = {}
+    for player_id, name in db.session.execute(
+        db.select(Players.id, Players.name)
+        .where(Players.name.in_(set(participant_names)))
+        .order_by(Players.id)
+    ):
+        players_by_name.setdefault(name, player_id)
+
     participants = []
     for name in participant_names:
-        player = Players.query.filter_by(name=name).first()
-        if not player:
+        if name not in players_by_name:
             raise ValueError(f"Player '{name}' not found.")
-        participants.append(player.id)
+        participants.append(players_by_name[name])
 
-    # Create initial matches for round 0
-    max_id = db.session.query(db.func.max(Matches.id)).scalar() or 0
-    start_id = max_id + 1  # Starting match ID for this set of matches
+    rows = build_bracket(participants)
 
-    for player_id in participants:
-        match = Matches()
-        match.match_info_id = info_id
-        match.winner_player_id = player_id
-        match.round = 0
-        db.session.add(match)
+    # Replace the existing bracket of this event
+    Matches.query.filter_by(match_info_id=info_id).delete()
 
+    # Inserted round by round with IDs generated by the database: a round's
+    # rows link to the IDs just assigned to the earlier rounds, so concurrent
+    # writers never collide. Each round is one multi-row INSERT ... VALUES;
+    # the database numbers its rows in VALUES order, so reading the round
+    # back ordered by ID lines the new IDs up with the rows. Two statements
+    # per round, whatever the dialect.
+    ids = []
+    for rnd, round_rows in groupby(rows, key=lambda row: row['round']):
+        db.session.execute(db.insert(Matches).values([
+            {
+                'match_info_id': info_id,
+                'round': rnd,
+                'player1_id': row['player1_id'],
+                'player2_id': row['player2_id'],
+                'winner_player_id': row['winner_player_id'],
+                'last_match1_id': ids[row['last_match1']] if row['last_match1'] is not None else None,
+                'last_match2_id': ids[row['last_match2']] if row['last_match2'] is not None else None,
+                'score1': 0,
+                'score2': 0,
+            }
+            for row in round_rows
+        ]))
+        ids.extend(db.session.scalars(
+            db.select(Matches.id)
+            .where(Matches.match_info_id == info_id, Matches.round == rnd)
+            .order_by(Matches.id)
+        ).all())
     db.session.commit()
 
-    # Create matches for subsequent rounds
-    max_id = db.session.query(db.func.max(Matches.id)).scalar()
-    lst = [mx_id for mx_id in range(start_id, max_id + 1)]
-    duo1 = rnd02infinite(previous_matches_ids=lst, rnd=1, info_id=info_id, start_id=start_id)
-    start_id = max_id + 1
-    max_id = db.session.query(db.func.max(Matches.id)).scalar()
-    lst = [mx_id for mx_id in range(start_id, max_id + 1)]
-    duo2 = rnd02infinite(previous_matches_ids=lst, rnd=2, info_id=info_id, start_id=start_id)
-
-    # Handle odd number of participants
-    if duo1:
-        match = Matches()
-        match.last_match1_id = duo2
-        match.last_match2_id = duo1
-        match.player1_id = Matches.query.get(duo2).winner_player_id  # Set player1_id to the winner of last_match1
-        match.player2_id = Matches.query.get(duo1).winner_player_id  # Set player2_id to the winner of last_match2
-        match.score1 = 0
-        match.score2 = 0
-        match.match_info_id = info_id
-        match.round = 2
-        db.session.add(match)
+def apply_match_results(info_id, results):
+    """
+    Apply many match results of one event at once.
 
-    db.session.commit()
+    The bracket is loaded with one query and the results are applied in
+    round order, so a winner moved into a later match is already there when
+    that match's own result is checked. Corrections ripple through all later
+    rounds (see BracketGraph.set_result). Nothing is committed: the caller
+    commits on success and rolls back on error, so the batch is all or
+    nothing.
 
-    # Create the final round of matches
-    create_final_round(info_id=info_id, three_matches=[max_id + 1, max_id + 2, max_id + 3])
+    Args:
+        info_id (int): The ID of the match info the matches belong to.
+        results (list): Dicts with match_id, score1, score2 and winner (a
+            player ID, or None to leave the match undecided).
 
-def create_final_round(info_id, three_matches):
+    Returns:
+        tuple: (updated, changed) where updated counts the matches whose
+        result changed and changed lists every modified match, including the
+        later-round matches that received or lost a player.
+
+    Raises:
+        ValueError: With one line per invalid row; nothing is applied.
+    """
+    graph = load_bracket_graph(info_id)
+
+    errors = []
+    rows = []
+    for result in results:
+        try:
+            match_id = int(result['match_id'])
+            score1, score2 = int(result['score1']), int(result['score2'])
+            winner = int(result['winner']) if result.get('winner') not in (None, '') else None
+        except (KeyError, TypeError, ValueError):
+            errors.append(f"Invalid row: {result!r}")
+            continue
+        if match_id not in graph:
+            errors.append(f"Match {match_id} is not part of this event.")
+        elif score1 < 0 or score2 < 0:
+            errors.append(f"Match {match_id}: scores cannot be negative.")
+        else:
+            rows.append((graph.get(match_id), score1, score2, winner))
+
+    updated = 0
+    for match, score1, score2, winner in sorted(rows, key=lambda row: (row[0].round, row[0].id)):
+        if winner is not None and winner not in (match.player1_id, match.player2_id):
+            errors.append(f"Match {match.id}: the winner must be one of its two players.")
+            continue
+        if graph.set_result(match.id, score1, score2, winner):
+            updated += 1
+
+    if errors:
+        raise ValueError("\n".join(errors))
+    return updated, list(graph.changed.values())
+
+# Header aliases accepted by the bulk player import
+IMPORT_COLUMNS = {
+    'name': 'name',
+    'medals': 'medals',
+    'house': 'house_id1',
+    'house1': 'house_id1',
+    'house_id1': 'house_id1',
+    'house2': 'house_id2',
+    'house_id2': 'house_id2',
+}
+
+def import_players_csv(lines, batch_size=1000, max_errors=200):
     """
-    Create the final round of matches between the top 3 players.
+    Stream player rows from a CSV file into the database.
+
+    Rows are read one at a time and inserted in batches, each batch in its own
+    transaction, so memory stays flat however long the file is. House IDs are
+    checked against the house cache, and names against the set of existing
+    names (and the names earlier in the file).
 
     Args:
-        info_id (int): The ID of the match info this match belongs to.
-        three_matches (list): The three match IDs for the final round.
-    """
-    # Get the IDs of the last 3 matches
-    match_ids = three_matches
-
-    # Fetch the winners of the last 3 matches
-    winner1 = Matches.query.get(match_ids[0]).winner_player_id
-    winner2 = Matches.query.get(match_ids[1]).winner_player_id
-    winner3 = Matches.query.get(match_ids[2]).winner_player_id
-
-    # Create the final matches
-    match1 = Matches()
-    match1.last_match1_id = match_ids[0]
-    match1.last_match2_id = match_ids[1]
-    match1.player1_id = winner1  # Set player1_id to the winner of last_match1
-    match1.player2_id = winner2  # Set player2_id to the winner of last_match2
-    match1.score1 = 0
-    match1.score2 = 0
-    match1.round = 3
-    match1.match_info_id = info_id
-    db.session.add(match1)
-
-    match2 = Matches()
-    match2.last_match1_id = match_ids[1]
-    match2.last_match2_id = match_ids[2]
-    match2.player1_id = winner2  # Set player1_id to the winner of last_match1
-    match2.player2_id = winner3  # Set player2_id to the winner of last_match2
-    match2.score1 = 0
-    match2.score2 = 0
-    match2.round = 3
-    match2.match_info_id = info_id
-    db.session.add(match2)
-
-    match3 = Matches()
-    match3.last_match1_id = match_ids[0]
-    match3.last_match2_id = match_ids[2]
-    match3.player1_id = winner1  # Set player1_id to the winner of last_match1
-    match3.player2_id = winner3  # Set player2_id to the winner of last_match2
-    match3.score1 = 0
-    match3.score2 = 0
-    match3.round = 3
-    match3.match_info_id = info_id
-    db.session.add(match3)
-
-    db.session.commit()
\ No newline at end of file
+        lines: An iterable of text lines, e.g. the uploaded file wrapped in
+            io.TextIOWrapper. The first line is the header; 'name' and
+            'house' (or 'house_id1') are required, 'house2' and 'medals'
+            are optional.
+        batch_size (int): Rows per insert and commit.
+        max_errors (int): How many row errors to keep for the report.
+
+    Returns:
+        dict: 'imported' and 'skipped' row counts, 'errors' as a list of
+        (line number, message) and 'error_count', which also counts the
+        errors beyond max_errors.
+
+    Raises:
+        ValueError: If the header is missing a required column.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("The file is empty.")
+    columns = [IMPORT_COLUMNS.get(column.strip().lower()) for column in header]
+    if 'name' not in columns or 'house_id1' not in columns:
+        raise ValueError("The header needs a 'name' and a 'house' column.")
+
+    house_ids = house_cache.ids()
+    seen = set(db.session.scalars(db.select(Players.name)))
+
+    report = {'imported': 0, 'skipped': 0, 'errors': [], 'error_count': 0}
+    batch = []
+
+    def fail(line, message):
+        report['error_count'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append((line, message))
+
+    def flush():
+        db.session.execute(db.insert(Players), batch)
+        db.session.commit()
+        report['imported'] += len(batch)
+        batch.clear()
+
+    for values in reader:
+        line = reader.line_num
+        if not any(value.strip() for value in values):
+            continue
+        row = {column: value.strip() for column, value in zip(columns, values) if column}
+
+        name = row.get('name', '')
+        house_id1 = row.get('house_id1', '').upper()
+        house_id2 = row.get('house_id2', '').upper() or None
+        if not name:
+            fail(line, "Missing name.")
+            continue
+        if len(name) > Players.NAME_LENGTH:
+            fail(line, f"Name longer than {Players.NAME_LENGTH} characters.")
+            continue
+        if house_id1 not in house_ids:
+            fail(line, f"Unknown house '{house_id1}'.")
+            continue
+        if house_id2 is not None and house_id2 not in house_ids:
+            fail(line, f"Unknown second house '{house_id2}'.")
+            continue
+        try:
+            medals = int(row.get('medals') or 0)
+        except ValueError:
+            fail(line, f"Medals must be a number, got '{row['medals']}'.")
+            continue
+        if name in seen:
+            report['skipped'] += 1
+            continue
+
+        seen.add(name)
+        batch.append({'name': name, 'medals': medals, 'house_id1': house_id1, 'house_id2': house_id2})
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return report
@@ -0,0 +1,7 @@
+from app import create_app
+from app.aio import SpectatorApp
+
+# Flask app for everything, with the spectator pages served asynchronously:
+#   uvicorn asgi:application --workers 2
+app = create_app()
+application = SpectatorApp(app)
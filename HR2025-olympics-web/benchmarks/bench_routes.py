@@ -0,0 +1,266 @@
+"""
+Route-level benchmark with synthetic tournament data.
+
+Builds a throwaway SQLite database with a configurable number of events,
+players and brackets, then drives every GET route of the main blueprint and
+the busiest management writes (winners form, batch scores) through the
+Flask test client and records latency percentiles and SQL statement counts
+per route. Without --warm every in-process cache (pages, fragments, houses,
+player names) is emptied before each request.
+
+Usage:
+    python benchmarks/bench_routes.py --events 500 --players 10000 --out bench.json
+    python benchmarks/bench_routes.py --baseline bench.json   # fails on regressions
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.cache import page_cache, fragment_cache, house_cache  # noqa: E402
+from app.config import SECRET_KEY  # noqa: E402
+from app.models import Houses, Players, Match_info, Matches, ScoringRule  # noqa: E402
+from app.search import player_index  # noqa: E402
+from app.utils import create_matches_from_names, rebuild_standings  # noqa: E402
+
+BRACKET_SIZES = [2, 3, 4, 5, 8, 12, 13, 16, 24, 32, 64, 128, 256]
+CATEGORIES = ['Individual', 'Team', 'House']
+# Streaming endpoints never finish, so they cannot be timed like a page
+SKIPPED_ENDPOINTS = {'static', 'main.live_event', 'main.live_houses'}
+
+
+def seed(app, n_events, n_players, n_brackets, rng):
+    # Fill the database with synthetic houses, players, events and brackets
+    with app.app_context():
+        db.create_all()
+        Houses.create_default_houses()
+        Players.create_default_players()
+        ScoringRule.create_default_rules()
+        rebuild_standings()
+        house_ids = [h.id for h in Houses.query.all()]
+
+        db.session.execute(db.insert(Players), [
+            {'name': f"Player {i:05d}", 'medals': 0, 'house_id1': rng.choice(house_ids)}
+            for i in range(n_players)
+        ])
+
+        start = datetime(2025, 3, 1, 8, 0)
+        events = []
+        for i in range(n_events):
+            begins = start + timedelta(days=i % 14, hours=rng.randrange(10))
+            events.append({
+                'name': f"Event {i:04d}",
+                'start_time': begins,
+                'end_time': begins + timedelta(hours=2),
+                'description': f"Synthetic event {i}",
+                'category': CATEGORIES[i % len(CATEGORIES)],
+                'status': rng.randrange(3),
+            })
+        db.session.execute(db.insert(Match_info), events)
+        db.session.commit()
+
+        event_ids = [e.id for e in Match_info.query.order_by(Match_info.id).limit(n_brackets)]
+        names = [f"Player {i:05d}" for i in range(n_players)]
+        for i, info_id in enumerate(event_ids):
+            size = min(BRACKET_SIZES[i % len(BRACKET_SIZES)], len(names))
+            create_matches_from_names(rng.sample(names, size), info_id)
+
+
+def sample_args(app):
+    # View arguments for every URL parameter used by the routes
+    with app.app_context():
+        # The event with the largest bracket is the worst case for the bracket pages
+        info_id, = db.session.execute(
+            db.select(Matches.match_info_id)
+            .group_by(Matches.match_info_id)
+            .order_by(db.func.count().desc())
+            .limit(1)
+        ).one()
+        match_id = db.session.scalar(
+            db.select(Matches.id).where(Matches.match_info_id == info_id, Matches.round == 1).limit(1)
+        )
+        player_id = db.session.scalar(db.select(Players.id).limit(1))
+    return {
+        'key': SECRET_KEY,
+        'match_info_id': info_id,
+        'match_id': info_id,
+        'player_id': player_id,
+        # In management_upload_scores match_id is a Matches row, not an event
+        ('main.management_upload_scores', 'match_id'): match_id,
+    }
+
+
+def route_urls(app, args):
+    urls = {}
+    with app.test_request_context():
+        for rule in app.url_map.iter_rules():
+            if rule.endpoint in SKIPPED_ENDPOINTS or 'GET' not in rule.methods:
+                continue
+            if rule.endpoint in urls:
+                continue  # several rules for one view (e.g. / and /home)
+            values = {name: args.get((rule.endpoint, name), args.get(name)) for name in rule.arguments}
+            urls[rule.endpoint] = rule.build(values, append_unknown=False)[1]
+    urls['main.autocomplete_players'] += '?q=pla'
+    return urls
+
+
+def write_requests(app, args):
+    # Management writes as (url, body for iteration i); each iteration
+    # changes the data, so every request does the full write
+    key, info_id = args['key'], args['match_info_id']
+    with app.app_context():
+        first_round = db.session.execute(
+            db.select(Matches.id, Matches.player1_id, Matches.player2_id)
+            .where(Matches.match_info_id == info_id, Matches.round == 1)
+            .order_by(Matches.id)
+        ).all()
+        names = db.session.scalars(db.select(Players.name).order_by(Players.id).limit(4)).all()
+
+    def winners(i):
+        podium = names[i % 2:] + names[:i % 2]
+        return {'data': dict(zip(('first_place', 'second_place', 'third_place'), podium))}
+
+    def batch_scores(i):
+        # Alternate the winners so the results move through the later rounds
+        return {'json': {'results': [
+            {'match_id': match_id, 'score1': 1 + i % 2, 'score2': 2 - i % 2,
+             'winner': player1_id if i % 2 else player2_id}
+            for match_id, player1_id, player2_id in first_round
+        ]}}
+
+    return {
+        'main.management_save_winner': (f'/{key}/management/matches/all/{info_id}/win/', winners),
+        'main.management_batch_scores': (f'/{key}/management/matches/all/{info_id}/batch/', batch_scores),
+    }
+
+
+def clear_caches():
+    # Cold start for every in-process cache a request can be served from
+    page_cache.clear()
+    fragment_cache.clear()
+    house_cache.invalidate()
+    player_index.invalidate()
+
+
+def run(app, urls, writes, iterations, warm):
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count)
+
+    client = app.test_client()
+    requests = {endpoint: ('GET', url, lambda i: {}) for endpoint, url in urls.items()}
+    requests.update({f"POST {endpoint}": ('POST', url, body) for endpoint, (url, body) in writes.items()})
+    results = {}
+    for name, (method, url, body) in sorted(requests.items()):
+        timings, counts, status = [], [], None
+        client.open(url, method=method, **body(0))  # warm-up: template compilation, first connection
+        for i in range(1, iterations + 1):
+            if not warm:
+                clear_caches()
+            statements[0] = 0
+            started = time.perf_counter()
+            response = client.open(url, method=method, **body(i))
+            timings.append((time.perf_counter() - started) * 1000)
+            counts.append(statements[0])
+            status = response.status_code
+        timings.sort()
+        results[name] = {
+            'url': url,
+            'status': status,
+            'p50_ms': round(statistics.median(timings), 3),
+            'p90_ms': round(timings[int(len(timings) * 0.9) - 1], 3),
+            'p99_ms': round(timings[max(int(len(timings) * 0.99) - 1, 0)], 3),
+            'max_ms': round(timings[-1], 3),
+            'sql_statements': max(counts),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # A route regresses when it is slower than the baseline beyond the
+    # tolerance or when it issues more SQL statements
+    regressions = []
+    for endpoint, current in results['routes'].items():
+        previous = baseline.get('routes', {}).get(endpoint)
+        if not previous:
+            continue
+        if current['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p50 {previous['p50_ms']}ms -> {current['p50_ms']}ms")
+        if current['sql_statements'] > previous['sql_statements']:
+            regressions.append(
+                f"{endpoint}: SQL statements {previous['sql_statements']} -> {current['sql_statements']}"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=500, help="number of Match_info rows")
+    parser.add_argument('--players', type=int, default=10000, help="number of Players rows")
+    parser.add_argument('--brackets', type=int, default=50, help="events that get a bracket")
+    parser.add_argument('--iterations', type=int, default=50, help="requests per route")
+    parser.add_argument('--warm', action='store_true', help="keep the in-process caches between requests")
+    parser.add_argument('--seed', type=int, default=2025)
+    parser.add_argument('--out', default='bench_results.json', help="where to write the results")
+    parser.add_argument('--baseline', help="results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    options = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'WTF_CSRF_ENABLED': False,
+        })
+        rng = random.Random(options.seed)
+
+        started = time.perf_counter()
+        seed(app, options.events, options.players, options.brackets, rng)
+        seed_seconds = time.perf_counter() - started
+
+        args = sample_args(app)
+        routes = run(app, route_urls(app, args), write_requests(app, args), options.iterations, options.warm)
+        with app.app_context():
+            db.engine.dispose()
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'params': vars(options),
+        'startup_seconds': round(app.config['STARTUP_SECONDS'], 4),
+        'seed_seconds': round(seed_seconds, 3),
+        'routes': routes,
+    }
+    with open(options.out, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    width = max(len(endpoint) for endpoint in routes)
+    print(f"{'route'.ljust(width)}  status  p50 ms  p90 ms  p99 ms  sql")
+    for endpoint, r in routes.items():
+        print(f"{endpoint.ljust(width)}  {r['status']:>6}  {r['p50_ms']:>6.2f}  {r['p90_ms']:>6.2f}  "
+              f"{r['p99_ms']:>6.2f}  {r['sql_statements']:>3}")
+    print(f"startup {results['startup_seconds']}s, seeding {results['seed_seconds']}s, written to {options.out}")
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            regressions = compare(results, json.load(f), options.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Concurrent read/write throughput on SQLite, with and without the connection PRAGMAs.
+
+Runs the same mix twice on a fresh database file: reader threads load
+brackets and the standings (spectators), writer threads record match
+scores and commit (referees). The first run uses SQLite's defaults
+(rollback journal, synchronous=FULL), the second the SQLITE_PRAGMAS of the
+app config (WAL, synchronous=NORMAL, busy_timeout, mmap). Reports
+operations per second and how many operations failed with
+"database is locked".
+
+Usage:
+    python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.models import Matches  # noqa: E402
+from app.utils import load_bracket, house_standings  # noqa: E402
+from bench_routes import seed  # noqa: E402
+
+
+def worker(app, write, match_ids, info_ids, deadline, counts, rng):
+    with app.app_context():
+        while time.perf_counter() < deadline:
+            try:
+                if write:
+                    db.session.execute(
+                        db.update(Matches)
+                        .where(Matches.id == rng.choice(match_ids))
+                        .values(score1=rng.randrange(10), score2=rng.randrange(10))
+                    )
+                    db.session.commit()
+                else:
+                    load_bracket(rng.choice(info_ids))
+                    house_standings()
+                    db.session.rollback()  # end the read transaction like a request would
+                counts['writes' if write else 'reads'] += 1
+            except OperationalError as e:
+                db.session.rollback()
+                counts['locked' if 'locked' in str(e) else 'errors'] += 1
+
+
+def run(pragmas, options):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'concurrency.db')}",
+            'SQLITE_PRAGMAS': pragmas,
+        }, env='testing')
+        seed(app, n_events=200, n_players=2000, n_brackets=20, rng=random.Random(options.seed))
+        with app.app_context():
+            match_ids = list(db.session.scalars(db.select(Matches.id).where(Matches.round >= 1)))
+            info_ids = list(set(db.session.scalars(db.select(Matches.match_info_id))))
+            journal = db.session.execute(db.text("PRAGMA journal_mode")).scalar()
+
+        # One counter per thread, summed at the end
+        per_thread = [{'reads': 0, 'writes': 0, 'locked': 0, 'errors': 0}
+                      for _ in range(options.writers + options.readers)]
+        deadline = time.perf_counter() + options.seconds
+        threads = [
+            threading.Thread(target=worker, args=(
+                app, i < options.writers, match_ids, info_ids, deadline, counts, random.Random(i)
+            ))
+            for i, counts in enumerate(per_thread)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with app.app_context():
+            db.engine.dispose()
+
+    totals = {key: sum(counts[key] for counts in per_thread) for key in per_thread[0]}
+    totals['journal_mode'] = journal
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8, help="spectator threads")
+    parser.add_argument('--writers', type=int, default=2, help="referee threads")
+    parser.add_argument('--seconds', type=float, default=5, help="duration of each run")
+    parser.add_argument('--seed', type=int, default=2025)
+    options = parser.parse_args(argv)
+
+    print(f"{'mode':<10} {'journal':<8} {'reads/s':>9} {'writes/s':>9} {'locked':>7} {'errors':>7}")
+    for label, pragmas in (('defaults', {}), ('pragmas', Config.SQLITE_PRAGMAS)):
+        counts = run(pragmas, options)
+        print(f"{label:<10} {counts['journal_mode']:<8} {counts['reads'] / options.seconds:>9.0f} "
+              f"{counts['writes'] / options.seconds:>9.0f} {counts['locked']:>7} {counts['errors']:>7}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""Added live events
+
+Revision ID: 3f8d6b2c0e71
+Revises: 7c2f5e9a1d34
+Create Date: 2026-10-19 11:27:53.904112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8d6b2c0e71'
+down_revision = '7c2f5e9a1d34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('live_events',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('channel', sa.String(length=50), nullable=False),
+    sa.Column('event', sa.String(length=30), nullable=False),
+    sa.Column('data', sa.TEXT(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('live_events', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_live_events_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('live_events', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_live_events_created_at'))
+
+    op.drop_table('live_events')
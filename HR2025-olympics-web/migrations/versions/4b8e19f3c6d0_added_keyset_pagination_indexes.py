@@ -0,0 +1,43 @@
+"""Added keyset pagination indexes
+
+Revision ID: 4b8e19f3c6d0
+Revises: c7e4a2d95b13
+Create Date: 2026-10-18 16:05:42.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e19f3c6d0'
+down_revision = 'c7e4a2d95b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The single-column indexes are prefixes of the new ones
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_index('ix_players_house_id1')
+        batch_op.drop_index('ix_players_name')
+        batch_op.create_index('ix_players_name_id', ['name', 'id'], unique=False, mysql_length={'name': 64})
+        batch_op.create_index('ix_players_house_id1_name_id', ['house_id1', 'name', 'id'], unique=False, mysql_length={'name': 64})
+
+    with op.batch_alter_table('match_info', schema=None) as batch_op:
+        batch_op.drop_index('ix_match_info_status')
+        batch_op.create_index('ix_match_info_status_id', ['status', 'id'], unique=False)
+        batch_op.create_index('ix_match_info_category_status_id', ['category', 'status', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('match_info', schema=None) as batch_op:
+        batch_op.drop_index('ix_match_info_category_status_id')
+        batch_op.drop_index('ix_match_info_status_id')
+        batch_op.create_index('ix_match_info_status', ['status'], unique=False)
+
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_index('ix_players_house_id1_name_id')
+        batch_op.drop_index('ix_players_name_id')
+        batch_op.create_index('ix_players_name', ['name'], unique=False, mysql_length=64)
+        batch_op.create_index('ix_players_house_id1', ['house_id1'], unique=False)
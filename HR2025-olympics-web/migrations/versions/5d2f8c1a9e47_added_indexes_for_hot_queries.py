@@ -0,0 +1,46 @@
+"""Added indexes for hot queries
+
+Revision ID: 5d2f8c1a9e47
+Revises: e33bb4515a88
+Create Date: 2026-10-18 11:02:14.903512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f8c1a9e47'
+down_revision = 'e33bb4515a88'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.create_index('ix_matches_match_info_id_round', ['match_info_id', 'round'], unique=False)
+        batch_op.create_index('ix_matches_last_match1_id', ['last_match1_id'], unique=False)
+        batch_op.create_index('ix_matches_last_match2_id', ['last_match2_id'], unique=False)
+
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.create_index('ix_players_name', ['name'], unique=False, mysql_length=64)
+        batch_op.create_index('ix_players_house_id1', ['house_id1'], unique=False)
+
+    with op.batch_alter_table('match_info', schema=None) as batch_op:
+        batch_op.create_index('ix_match_info_status', ['status'], unique=False)
+        batch_op.create_index('ix_match_info_start_time', ['start_time'], unique=False, mysql_length=32)
+
+
+def downgrade():
+    with op.batch_alter_table('match_info', schema=None) as batch_op:
+        batch_op.drop_index('ix_match_info_start_time')
+        batch_op.drop_index('ix_match_info_status')
+
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_index('ix_players_house_id1')
+        batch_op.drop_index('ix_players_name')
+
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_index('ix_matches_last_match2_id')
+        batch_op.drop_index('ix_matches_last_match1_id')
+        batch_op.drop_index('ix_matches_match_info_id_round')
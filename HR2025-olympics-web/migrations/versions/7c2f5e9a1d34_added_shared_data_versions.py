@@ -0,0 +1,29 @@
+"""Added shared data versions
+
+Revision ID: 7c2f5e9a1d34
+Revises: e6d3a0f71b52
+Create Date: 2026-10-19 09:41:18.227604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2f5e9a1d34'
+down_revision = 'e6d3a0f71b52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('data_versions',
+    sa.Column('scope', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+
+
+def downgrade():
+    op.drop_table('data_versions')
@@ -0,0 +1,67 @@
+"""Match_info start and end times to DateTime
+
+Revision ID: 9a41c07be3d2
+Revises: 5d2f8c1a9e47
+Create Date: 2026-10-18 11:48:05.217640
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a41c07be3d2'
+down_revision = '5d2f8c1a9e47'
+branch_labels = None
+depends_on = None
+
+# Formats the times were typed in while the columns were free text
+INPUT_FORMATS = ('%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d')
+
+
+def _parse(text):
+    for fmt in INPUT_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), fmt)
+        except (ValueError, AttributeError):
+            pass
+    return None
+
+
+def upgrade():
+    bind = op.get_bind()
+    sqlite = bind.dialect.name == 'sqlite'
+    # SQLAlchemy stores SQLite datetimes as ISO text with microseconds
+    storage_format = '%Y-%m-%d %H:%M:%S.%f' if sqlite else '%Y-%m-%d %H:%M:%S'
+
+    # Normalize the free-text values; anything unreadable becomes NULL
+    match_info = sa.table('match_info', sa.column('id'), sa.column('start_time'), sa.column('end_time'))
+    for row in bind.execute(sa.select(match_info)).all():
+        values = {}
+        for column in ('start_time', 'end_time'):
+            parsed = _parse(getattr(row, column))
+            values[column] = parsed.strftime(storage_format) if parsed else None
+        bind.execute(match_info.update().where(match_info.c.id == row.id).values(**values))
+
+    if sqlite:
+        # SQLite keeps the normalized text as is; a batch copy would CAST it to a number
+        return
+
+    with op.batch_alter_table('match_info', schema=None) as batch_op:
+        batch_op.drop_index('ix_match_info_start_time')
+        batch_op.alter_column('start_time', existing_type=sa.TEXT(), type_=sa.DateTime(), existing_nullable=True)
+        batch_op.alter_column('end_time', existing_type=sa.TEXT(), type_=sa.DateTime(), existing_nullable=True)
+        batch_op.create_index('ix_match_info_start_time', ['start_time'], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+
+    with op.batch_alter_table('match_info', schema=None) as batch_op:
+        batch_op.drop_index('ix_match_info_start_time')
+        batch_op.alter_column('start_time', existing_type=sa.DateTime(), type_=sa.TEXT(), existing_nullable=True)
+        batch_op.alter_column('end_time', existing_type=sa.DateTime(), type_=sa.TEXT(), existing_nullable=True)
+        batch_op.create_index('ix_match_info_start_time', ['start_time'], unique=False, mysql_length=32)
@@ -0,0 +1,41 @@
+"""Added scoring rules and house multipliers
+
+Revision ID: c7e4a2d95b13
+Revises: 9a41c07be3d2
+Create Date: 2026-10-18 14:21:07.215904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e4a2d95b13'
+down_revision = '9a41c07be3d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    scoring_rules = op.create_table('scoring_rules',
+    sa.Column('category', sa.String(length=20), nullable=False),
+    sa.Column('placement', sa.Integer(), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('category', 'placement')
+    )
+    with op.batch_alter_table('houses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('multiplier', sa.Float(), server_default='1', nullable=False))
+
+    # The points that used to be hard-coded in management_save_winner
+    op.bulk_insert(scoring_rules, [
+        {'category': category, 'placement': placement, 'points': points}
+        for category, row in (('Individual', (25, 20, 15)), ('Team', (50, 45, 40)), ('House', (75, 65, 55)))
+        for placement, points in enumerate(row, start=1)
+    ])
+
+
+def downgrade():
+    with op.batch_alter_table('houses', schema=None) as batch_op:
+        batch_op.drop_column('multiplier')
+
+    op.drop_table('scoring_rules')
@@ -0,0 +1,79 @@
+"""Added house points ledger and materialized standings
+
+Revision ID: e33bb4515a88
+Revises: bb759dbe02b4
+Create Date: 2026-10-18 10:12:31.448127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e33bb4515a88'
+down_revision = 'bb759dbe02b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('house_points_ledger',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('house_id', sa.String(length=2), nullable=False),
+    sa.Column('match_info_id', sa.Integer(), nullable=True),
+    sa.Column('placement', sa.Integer(), nullable=True),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['house_id'], ['houses.id'], ),
+    sa.ForeignKeyConstraint(['match_info_id'], ['match_info.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('house_points_ledger', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_house_points_ledger_house_id'), ['house_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_house_points_ledger_match_info_id'), ['match_info_id'], unique=False)
+
+    op.create_table('house_standings',
+    sa.Column('house_id', sa.String(length=2), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['house_id'], ['houses.id'], ),
+    sa.PrimaryKeyConstraint('house_id')
+    )
+    with op.batch_alter_table('house_standings', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_house_standings_rank'), ['rank'], unique=False)
+
+    # Open the ledger with the current totals and materialize the standings.
+    # Built with table constructs so identifiers are quoted per dialect
+    # (RANK is a reserved word in MySQL 8).
+    houses = sa.table('houses', sa.column('id', sa.String), sa.column('points', sa.Integer))
+    ledger = sa.table('house_points_ledger', sa.column('house_id', sa.String),
+                      sa.column('points', sa.Integer), sa.column('created_at', sa.DateTime))
+    standings = sa.table('house_standings', sa.column('house_id', sa.String),
+                         sa.column('points', sa.Integer), sa.column('rank', sa.Integer))
+
+    op.execute(ledger.insert().from_select(
+        ['house_id', 'points', 'created_at'],
+        sa.select(houses.c.id, houses.c.points, sa.func.current_timestamp()).where(houses.c.points != 0),
+    ))
+
+    other = houses.alias('o')
+    rank = sa.select(sa.func.count()).select_from(other).where(sa.or_(
+        other.c.points > houses.c.points,
+        sa.and_(other.c.points == houses.c.points, other.c.id < houses.c.id),
+    )).scalar_subquery() + 1
+    op.execute(standings.insert().from_select(
+        ['house_id', 'points', 'rank'],
+        sa.select(houses.c.id, houses.c.points, rank),
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('house_standings', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_house_standings_rank'))
+
+    op.drop_table('house_standings')
+    with op.batch_alter_table('house_points_ledger', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_house_points_ledger_match_info_id'))
+        batch_op.drop_index(batch_op.f('ix_house_points_ledger_house_id'))
+
+    op.drop_table('house_points_ledger')
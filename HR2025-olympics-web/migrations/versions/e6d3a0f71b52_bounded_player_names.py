@@ -0,0 +1,36 @@
+"""Bounded player names
+
+Revision ID: e6d3a0f71b52
+Revises: 4b8e19f3c6d0
+Create Date: 2026-10-18 21:12:07.604318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6d3a0f71b52'
+down_revision = '4b8e19f3c6d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # MySQL can only index a prefix of a TEXT column, which cannot order the
+    # keyset pages; a VARCHAR is indexed whole
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_index('ix_players_house_id1_name_id')
+        batch_op.drop_index('ix_players_name_id')
+        batch_op.alter_column('name', existing_type=sa.TEXT(), type_=sa.String(length=100))
+        batch_op.create_index('ix_players_name_id', ['name', 'id'], unique=False)
+        batch_op.create_index('ix_players_house_id1_name_id', ['house_id1', 'name', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_index('ix_players_house_id1_name_id')
+        batch_op.drop_index('ix_players_name_id')
+        batch_op.alter_column('name', existing_type=sa.String(length=100), type_=sa.TEXT())
+        batch_op.create_index('ix_players_name_id', ['name', 'id'], unique=False, mysql_length={'name': 64})
+        batch_op.create_index('ix_players_house_id1_name_id', ['house_id1', 'name', 'id'], unique=False, mysql_length={'name': 64})
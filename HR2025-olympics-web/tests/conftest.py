@@ -0,0 +1,60 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models import Match_info, Players  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    # Fresh in-memory database per test, seeded like `flask bootstrap`
+    app = create_app(env='testing')
+    result = app.test_cli_runner().invoke(args=['bootstrap'])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(app):
+    # count_queries() -> context manager yielding a list that collects the statements
+    class Counter:
+        def __init__(self):
+            self.statements = []
+
+        def _record(self, conn, cursor, statement, parameters, context, executemany):
+            self.statements.append(statement)
+
+        def __enter__(self):
+            event.listen(db.engine, 'after_cursor_execute', self._record)
+            return self.statements
+
+        def __exit__(self, *exc):
+            event.remove(db.engine, 'after_cursor_execute', self._record)
+
+    return Counter
+
+
+def add_players(names):
+    for name in names:
+        Players.new(name=name, medals=0, house_id1='A3')
+    db.session.commit()
+
+
+def add_event(name='Chess', category='Individual', status=1):
+    info = Match_info.new(name, datetime(2025, 3, 1, 10), datetime(2025, 3, 1, 12), 'd', category, status=status)
+    db.session.commit()
+    return info
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip('asgiref')
+pytest.importorskip('aiosqlite')
+
+from app import create_app, db  # noqa: E402
+from app.aio import SpectatorApp  # noqa: E402
+from app.live import live  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    # A database file: the async engine has to see the same data
+    app = create_app(config={
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'aio.db'}",
+        'LIVE_HEARTBEAT_SECONDS': 0.05,
+        'LIVE_POLL_SECONDS': 0.02,
+        'LIVE_STREAM_MAX_SECONDS': 3,
+    }, env='testing')
+    result = app.test_cli_runner().invoke(args=['bootstrap'])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def http_scope(path, headers=()):
+    return {
+        'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'), *headers], 'server': ('testserver', 80), 'client': ('127.0.0.1', 1),
+    }
+
+
+class Client:
+    # One ASGI request; disconnect() makes receive() report the client gone
+    def __init__(self, application, path, headers=()):
+        self.application, self.scope = application, http_scope(path, headers)
+        self.sent = []
+        self.started = asyncio.Event()
+        self.gone = asyncio.Event()
+        self._requested = False
+
+    async def receive(self):
+        if not self._requested:
+            self._requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.gone.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        self.sent.append(message)
+        if message['type'] == 'http.response.body':
+            self.started.set()
+
+    def disconnect(self):
+        self.gone.set()
+
+    def run(self):
+        return asyncio.create_task(self.application(self.scope, self.receive, self.send))
+
+    @property
+    def status(self):
+        return self.sent[0]['status']
+
+    @property
+    def body(self):
+        return b''.join(message.get('body', b'') for message in self.sent[1:]).decode()
+
+
+def test_open_live_stream_does_not_block_flask_routes(app):
+    application = SpectatorApp(app)
+
+    async def scenario():
+        stream = Client(application, '/live/houses')
+        held = stream.run()
+        await asyncio.wait_for(stream.started.wait(), 2)
+
+        page = Client(application, '/about/')
+        # Served while the stream is still open, long before it ends
+        await asyncio.wait_for(page.run(), 1)
+        assert not held.done()
+        stream.disconnect()
+        await asyncio.wait_for(held, 1)
+        return page
+
+    assert asyncio.run(scenario()).status == 200
+
+
+def test_live_streams_hold_no_thread(app):
+    app.config['ASGI_WSGI_THREADS'] = 1
+    application = SpectatorApp(app)
+    threads = threading.active_count()
+
+    async def scenario():
+        streams = [Client(application, f'/live/{i}') for i in range(100)]
+        tasks = [stream.run() for stream in streams]
+        await asyncio.wait_for(asyncio.gather(*(stream.started.wait() for stream in streams)), 5)
+        # aiosqlite keeps a thread per pooled connection, not one per stream
+        assert threading.active_count() - threads < 20
+
+        page = Client(application, '/about/')
+        await asyncio.wait_for(page.run(), 2)
+        for stream in streams:
+            stream.disconnect()
+        await asyncio.wait_for(asyncio.gather(*tasks), 2)
+        return page
+
+    assert asyncio.run(scenario()).status == 200
+    assert not application.live_hub._subscribers
+
+
+def test_live_stream_delivers_and_replays(app):
+    application = SpectatorApp(app)
+    seen = live.publish('event:3', 'matches', [1])
+    missed = live.publish('event:3', 'matches', [2])
+
+    async def scenario():
+        stream = Client(application, '/live/3', [(b'last-event-id', str(seen).encode())])
+        task = stream.run()
+        await asyncio.wait_for(stream.started.wait(), 2)
+        # Published by a management request, possibly in another process
+        await asyncio.to_thread(live.publish, 'event:4', 'matches', [3])
+        published = await asyncio.to_thread(live.publish, 'event:3', 'podium', {'places': []})
+        for _ in range(100):
+            if f'id: {published}\n' in stream.body:
+                break
+            await asyncio.sleep(0.02)
+        stream.disconnect()
+        await asyncio.wait_for(task, 1)
+        return stream, published
+
+    stream, published = asyncio.run(scenario())
+    assert stream.status == 200
+    body = stream.body
+    assert body.startswith('retry:')
+    assert f'id: {seen}\n' not in body
+    assert body.index(f'id: {missed}\n') < body.index(f'id: {published}\nevent: podium')
+    assert 'data: [3]' not in body
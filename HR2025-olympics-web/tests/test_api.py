@@ -0,0 +1,30 @@
+from app.config import SECRET_KEY
+from app.models import Players
+from conftest import add_event
+
+
+def test_saving_winners_refreshes_events_api(app, client):
+    info_id = add_event().id
+    players = Players.query.order_by(Players.id).limit(3).all()
+    ids, names = [p.id for p in players], [p.name for p in players]
+
+    assert client.get('/api/v1/events').get_json()['data'][0]['places'] == [None, None, None]
+
+    response = client.post(f'/{SECRET_KEY}/management/matches/all/{info_id}/win/', data={
+        'first_place': names[0], 'second_place': names[1], 'third_place': names[2],
+    })
+    assert response.status_code == 302
+
+    event = next(e for e in client.get('/api/v1/events').get_json()['data'] if e['id'] == info_id)
+    assert event['places'] == ids
+
+
+def test_bracket_of_unknown_event_is_404(app, client):
+    response = client.get('/api/v1/events/999/bracket')
+    assert response.status_code == 404
+    assert response.get_json() == {'error': 'Event not found.'}
+
+
+def test_bracket_of_event_without_matches_is_empty(app, client):
+    info_id = add_event().id
+    assert client.get(f'/api/v1/events/{info_id}/bracket').get_json() == {'event_id': info_id, 'rounds': []}
@@ -0,0 +1,108 @@
+import gzip
+import io
+import os
+
+import pytest
+
+from app.assets import IMMUTABLE, Assets, assets
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CSS = b'body { color: #123456; }\n' * 50
+
+
+def image_bytes(width, height):
+    Image = pytest.importorskip('PIL.Image')
+    out = io.BytesIO()
+    Image.new('RGB', (width, height), 'navy').save(out, 'JPEG')
+    return out.getvalue()
+
+
+@pytest.fixture
+def static(tmp_path):
+    os.makedirs(tmp_path / 'css')
+    (tmp_path / 'css' / 'base.css').write_bytes(CSS)
+    (tmp_path / 'css' / 'notes.txt').write_bytes(b'not an asset')
+    (tmp_path / 'logo.jpg').write_bytes(image_bytes(100, 50))
+    (tmp_path / 'logo2.jpg').write_bytes(image_bytes(480, 240))
+    return tmp_path
+
+
+@pytest.fixture
+def built(static, monkeypatch):
+    # The app's pipeline pointed at the temporary build
+    monkeypatch.setattr(assets, 'dist_dir', str(static / 'dist'))
+    monkeypatch.setattr(assets, 'manifest', {})
+    return assets.build(str(static))
+
+
+def test_build_fingerprints_and_compresses(static):
+    manifest = Assets().build(str(static))
+    dist = static / 'dist'
+
+    css = manifest['css/base.css']
+    assert css.startswith('css/base.') and css.endswith('.css')
+    assert (dist / css).read_bytes() == CSS
+    assert gzip.decompress((dist / f'{css}.gz').read_bytes()) == CSS
+    if brotli is not None:
+        assert brotli.decompress((dist / f'{css}.br').read_bytes()) == CSS
+    # Images are not compressed again, other files are not built
+    assert not (dist / f"{manifest['logo.jpg']}.gz").exists()
+    assert not any('notes' in name for name in manifest)
+    assert (dist / 'manifest.json').exists()
+
+
+def test_fingerprint_follows_the_content(static):
+    first = Assets().build(str(static))
+    assert Assets().build(str(static)) == first
+
+    (static / 'css' / 'base.css').write_bytes(CSS + b'a { color: red; }\n')
+    second = Assets().build(str(static))
+    assert second['css/base.css'] != first['css/base.css']
+    assert second['logo.jpg'] == first['logo.jpg']
+    # The old build is replaced
+    assert not (static / 'dist' / first['css/base.css']).exists()
+
+
+def test_images_are_resized_to_smaller_widths_only(static):
+    Image = pytest.importorskip('PIL.Image')
+    manifest = Assets().build(str(static))
+
+    with Image.open(static / 'dist' / manifest['logo2.jpg@240w']) as image:
+        assert image.size == (240, 120)
+    # Wider than the original: the original is used instead
+    assert 'logo2.jpg@960w' not in manifest
+
+
+def test_url_uses_the_manifest_when_built(app, built):
+    with app.test_request_context():
+        assert assets.url('css/base.css') == f"/static/dist/{built['css/base.css']}"
+        assert assets.url('logo2.jpg', width=240) == f"/static/dist/{built['logo2.jpg@240w']}"
+        # Unbuilt names and widths fall back to the plain file
+        assert assets.url('logo2.jpg', width=960) == '/static/logo2.jpg'
+        assets.manifest = {}
+        assert assets.url('css/base.css') == '/static/css/base.css'
+
+
+@pytest.mark.parametrize('accept, encoding', [('br, gzip', 'br'), ('gzip', 'gzip'), ('', None)])
+def test_serves_the_best_precompressed_variant(client, built, accept, encoding):
+    if brotli is None and encoding == 'br':
+        pytest.skip('brotli is not installed')
+    response = client.get(f"/static/dist/{built['css/base.css']}", headers={'Accept-Encoding': accept})
+
+    assert response.status_code == 200
+    assert response.headers.get('Content-Encoding') == encoding
+    assert response.headers['Cache-Control'] == IMMUTABLE
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.mimetype == 'text/css'
+    if encoding is None:
+        assert response.get_data() == CSS
+    response.close()
+
+
+@pytest.mark.parametrize('filename', ['css/missing.css', '../css/base.css', 'css'])
+def test_missing_or_outside_files_are_not_served(client, built, filename):
+    assert client.get(f'/static/dist/{filename}').status_code == 404
@@ -0,0 +1,82 @@
+import pytest
+
+from app import db
+from app.models import Matches
+from app.utils import apply_match_results, create_matches_from_names, load_bracket
+from conftest import add_event, add_players
+
+
+@pytest.fixture
+def bracket(app):
+    names = [f'P{i}' for i in range(4)]
+    add_players(names)
+    info_id = add_event().id
+    create_matches_from_names(names, info_id)
+    return info_id
+
+
+def batch_url(info_id):
+    return f'/your-secret-key/management/matches/all/{info_id}/batch/'
+
+
+def results(bracket):
+    db.session.expire_all()
+    return {m.id: (m.player1_id, m.player2_id, m.score1, m.score2, m.winner_player_id)
+            for m in db.session.scalars(db.select(Matches).where(Matches.match_info_id == bracket))}
+
+
+def test_valid_batch_is_applied_and_propagated(bracket, client):
+    (semi1, semi2), (final,) = load_bracket(bracket)
+    winner1, winner2 = semi1.player2_id, semi2.player1_id
+
+    response = client.post(batch_url(bracket), json={'results': [
+        {'match_id': semi1.id, 'score1': 1, 'score2': 4, 'winner': winner1},
+        {'match_id': semi2.id, 'score1': '2', 'score2': '0', 'winner': str(winner2)},
+    ]})
+
+    assert response.status_code == 200
+    assert response.get_json() == {'submitted': 2, 'updated': 2, 'propagated': 1}
+    rows = results(bracket)
+    assert rows[semi1.id][2:] == (1, 4, winner1)
+    assert rows[final.id][:2] == (winner1, winner2)
+
+
+def test_form_submission_renders_the_summary(bracket, client):
+    (semi1, _), _ = load_bracket(bracket)
+    response = client.post(batch_url(bracket), data={
+        'match_id': [semi1.id],
+        f'score1-{semi1.id}': '3', f'score2-{semi1.id}': '1', f'winner-{semi1.id}': semi1.player1_id,
+    })
+
+    assert response.status_code == 200
+    assert results(bracket)[semi1.id][4] == semi1.player1_id
+
+
+@pytest.mark.parametrize('bad_row, message', [
+    ({'match_id': 999999, 'score1': 1, 'score2': 0, 'winner': None}, 'Match 999999 is not part of this event.'),
+    ({'match_id': 'MATCH', 'score1': 'two', 'score2': 0}, 'Invalid row'),
+])
+def test_invalid_row_rejects_the_whole_batch(bracket, client, bad_row, message):
+    (semi1, _), _ = load_bracket(bracket)
+    before = results(bracket)
+
+    response = client.post(batch_url(bracket), json=[
+        {'match_id': semi1.id, 'score1': 3, 'score2': 0, 'winner': semi1.player1_id},
+        bad_row,
+    ])
+
+    assert response.status_code == 400
+    assert any(line.startswith(message) for line in response.get_json()['error'])
+    assert results(bracket) == before
+
+
+def test_non_integer_score_is_reported(bracket):
+    (semi1, _), _ = load_bracket(bracket)
+    with pytest.raises(ValueError, match='Invalid row'):
+        apply_match_results(bracket, [{'match_id': semi1.id, 'score1': '1.5', 'score2': 0}])
+
+
+def test_winner_must_play_in_the_match(bracket):
+    (semi1, semi2), _ = load_bracket(bracket)
+    with pytest.raises(ValueError, match='the winner must be one of its two players'):
+        apply_match_results(bracket, [{'match_id': semi1.id, 'score1': 1, 'score2': 0, 'winner': semi2.player1_id}])
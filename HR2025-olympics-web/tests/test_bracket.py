@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+from app.bracket import BracketGraph
+from app.utils import apply_match_results, create_matches_from_names, load_bracket
+from conftest import add_event, add_players
+
+
+def match(match_id, player1=None, player2=None, last1=None, last2=None, round=1):
+    return SimpleNamespace(
+        id=match_id, round=round, player1_id=player1, player2_id=player2, winner_player_id=None,
+        score1=0, score2=0, last_match1_id=last1, last_match2_id=last2,
+    )
+
+
+def four_player_bracket():
+    # Semi-finals 1 (players 1 v 2) and 2 (3 v 4); final 3; 4 takes the final's winner
+    return BracketGraph([
+        match(1, 1, 2), match(2, 3, 4), match(3, last1=1, last2=2, round=2), match(4, last1=3, round=3),
+    ])
+
+
+def test_winner_advances_into_the_next_round():
+    graph = four_player_bracket()
+
+    assert graph.set_result(1, 3, 1, 1)
+    assert graph.get(3).player1_id == 1 and graph.get(3).player2_id is None
+    assert set(graph.changed) == {1, 3}
+    # The same result again changes nothing
+    assert not graph.set_result(1, 3, 1, 1)
+
+
+def test_score_correction_keeps_the_later_rounds():
+    graph = four_player_bracket()
+    graph.set_result(1, 3, 1, 1)
+    graph.changed.clear()
+
+    assert graph.set_result(1, 4, 1, 1)
+    assert set(graph.changed) == {1}
+
+
+def test_correcting_a_propagated_winner_resets_the_later_results():
+    graph = four_player_bracket()
+    graph.set_result(1, 3, 1, 1)
+    graph.set_result(2, 2, 0, 3)
+    graph.set_result(3, 5, 2, 1)
+    assert graph.get(4).player1_id == 1
+
+    # Player 2 actually won the semi-final
+    graph.set_result(1, 1, 3, 2)
+
+    final = graph.get(3)
+    assert (final.player1_id, final.player2_id) == (2, 3)
+    assert (final.score1, final.score2, final.winner_player_id) == (0, 0, None)
+    # The withdrawn champion leaves the round after as well
+    assert graph.get(4).player1_id is None
+    assert set(graph.changed) >= {1, 3, 4}
+
+
+def test_children_are_the_reverse_links():
+    graph = four_player_bracket()
+    assert graph.children(1) == [(graph.get(3), 1)]
+    assert graph.children(2) == [(graph.get(3), 2)]
+    assert graph.children(4) == []
+    assert 3 in graph and 9 not in graph
+
+
+def test_round_decided_in_the_same_batch(app):
+    names = ['P1', 'P2', 'P3', 'P4']
+    add_players(names)
+    info_id = add_event().id
+    create_matches_from_names(names, info_id)
+    (semi1, semi2), (final,) = load_bracket(info_id)
+    p1, p4 = semi1.player1_id, semi2.player2_id
+
+    # The final comes first: its players are only known once the semis are applied
+    updated, changed = apply_match_results(info_id, [
+        {'match_id': final.id, 'score1': 2, 'score2': 1, 'winner': p4},
+        {'match_id': semi1.id, 'score1': 3, 'score2': 0, 'winner': p1},
+        {'match_id': semi2.id, 'score1': 0, 'score2': 3, 'winner': p4},
+    ])
+
+    assert updated == 3
+    assert {m.id for m in changed} == {semi1.id, semi2.id, final.id}
+    assert (final.player1_id, final.player2_id, final.winner_player_id) == (p1, p4, p4)
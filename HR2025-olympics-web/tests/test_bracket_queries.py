@@ -0,0 +1,62 @@
+import pytest
+
+from app.utils import create_matches_from_names, load_bracket, pair_football_round
+from conftest import add_event, add_players
+
+
+@pytest.mark.parametrize('size', [4, 32])
+def test_load_bracket_query_count_is_fixed(app, count_queries, size):
+    names = [f'P{i}' for i in range(size)]
+    add_players(names)
+    info_id = add_event().id
+    create_matches_from_names(names, info_id)
+
+    with count_queries() as statements:
+        rounds = load_bracket(info_id)
+        # Touch everything the templates read
+        for round_matches in rounds:
+            for match in round_matches:
+                match.player1, match.player2, match.winner_player
+        pair_football_round(rounds[0])
+
+    assert len(statements) == 1
+    assert [len(r) for r in rounds][0] == size // 2
+
+
+def test_create_matches_links_generated_ids(app):
+    from app import db
+    from app.models import Matches
+
+    names = [f'P{i}' for i in range(7)]
+    add_players(names)
+    first_id, second_id = add_event('Chess').id, add_event('Go').id
+    create_matches_from_names(names, first_id)
+    create_matches_from_names(names[:4], second_id)
+    # Recreating a bracket replaces it and keeps the other event's rows intact
+    create_matches_from_names(names, first_id)
+
+    for info_id, size in ((first_id, 7), (second_id, 4)):
+        matches = {m.id: m for m in db.session.scalars(db.select(Matches).where(Matches.match_info_id == info_id))}
+        assert sum(1 for m in matches.values() if m.round == 0) == size
+        for match in matches.values():
+            for parent_id, player_id in ((match.last_match1_id, match.player1_id),
+                                         (match.last_match2_id, match.player2_id)):
+                if parent_id is not None:
+                    parent = matches[parent_id]  # links stay inside the event
+                    assert parent.round < match.round
+                    if parent.round == 0:
+                        assert player_id == parent.winner_player_id
+
+
+def test_create_matches_query_count_grows_with_rounds(app, count_queries):
+    names = [f'P{i}' for i in range(256)]
+    add_players(names)
+    info_id = add_event().id
+
+    with count_queries() as statements:
+        create_matches_from_names(names, info_id)
+
+    # Names, delete, then an INSERT and an ID read-back for each of the 9 rounds
+    inserts = [s for s in statements if s.lstrip().upper().startswith('INSERT')]
+    assert len(inserts) == 9
+    assert len(statements) <= 2 + 2 * 9
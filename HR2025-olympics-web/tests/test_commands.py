@@ -0,0 +1,38 @@
+import os
+import shutil
+
+from app import create_app, db
+
+LEGACY_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'test.db')
+
+
+def bootstrap(path):
+    app = create_app(config={'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'}, env='testing')
+    result = app.test_cli_runner().invoke(args=['bootstrap'])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        state = (
+            db.session.execute(db.text('SELECT version_num FROM alembic_version')).scalar(),
+            {column['name'] for column in inspector.get_columns('houses')},
+            set(inspector.get_table_names()),
+        )
+        db.engine.dispose()
+    return state
+
+
+def test_bootstrap_upgrades_database_without_migration_history(tmp_path):
+    # The committed database predates the migrations
+    path = tmp_path / 'legacy.db'
+    shutil.copy(LEGACY_DB, path)
+
+    revision, columns, tables = bootstrap(path)
+    assert 'multiplier' in columns
+    assert {'house_points_ledger', 'data_versions', 'live_events'} <= tables
+    # Running it again has nothing left to do
+    assert bootstrap(path)[0] == revision
+
+
+def test_bootstrap_creates_empty_database_at_newest_revision(tmp_path):
+    legacy = bootstrap(shutil.copy(LEGACY_DB, tmp_path / 'legacy.db'))
+    assert bootstrap(tmp_path / 'new.db') == legacy
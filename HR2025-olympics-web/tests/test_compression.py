@@ -0,0 +1,79 @@
+import gzip
+
+import pytest
+from flask import Response
+
+from app.cache import data_changed
+from app.compression import brotli, compressor
+
+PAGE = '/houses_status/'
+
+
+def identity(client, url=PAGE):
+    return client.get(url, headers={'Accept-Encoding': 'identity'}).get_data()
+
+
+def test_gzip_is_negotiated(client):
+    plain = identity(client)
+    response = client.get(PAGE, headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == plain
+    assert len(response.get_data()) < len(plain)
+    assert 'Accept-Encoding' in response.headers['Vary']
+    # Same content, different bytes
+    assert response.headers['ETag'].startswith('W/')
+
+
+def test_brotli_is_preferred(client):
+    if brotli is None:
+        pytest.skip('brotli is not installed')
+    response = client.get(PAGE, headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.get_data()) == identity(client)
+
+
+def test_uncompressed_without_accept_encoding(client):
+    response = client.get(PAGE, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    # The representation still depends on the header
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_small_and_binary_responses_are_left_alone(app, client):
+    @app.route('/tiny/')
+    def tiny():
+        return 'ok'
+
+    response = client.get('/tiny/', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == b'ok'
+
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        image = compressor.compress(Response(b'\xff' * 5000, mimetype='image/jpeg'))
+        kept = compressor.compress(Response('x' * 5000, mimetype='text/plain', headers={'Cache-Control': 'no-transform'}))
+    assert 'Content-Encoding' not in image.headers
+    assert 'Content-Encoding' not in kept.headers
+
+
+def test_cached_page_is_compressed_once_per_version(client, monkeypatch):
+    calls = []
+    encode = compressor._encode
+    monkeypatch.setattr(compressor, '_encode', lambda data, encoding: calls.append(encoding) or encode(data, encoding))
+
+    first = client.get(PAGE, headers={'Accept-Encoding': 'gzip'})
+    second = client.get(PAGE, headers={'Accept-Encoding': 'gzip'})
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_data() == first.get_data()
+    assert calls == ['gzip']
+
+    data_changed('houses')
+    assert client.get(PAGE, headers={'Accept-Encoding': 'gzip'}).headers['X-Cache'] == 'MISS'
+    assert calls == ['gzip', 'gzip']
+
+
+def test_compressed_304_keeps_the_weak_etag(client):
+    etag = client.get(PAGE, headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    response = client.get(PAGE, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status_code == 304
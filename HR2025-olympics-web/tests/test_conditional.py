@@ -0,0 +1,65 @@
+from app.cache import data_changed
+from conftest import add_event
+
+
+def test_matching_if_none_match_gets_304(client):
+    first = client.get('/houses_status/')
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    response = client.get('/houses_status/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.get_data() == b''
+    # Compression hands out the weak form of the same tag
+    assert client.get('/houses_status/', headers={'If-None-Match': f'W/{etag}'}).status_code == 304
+
+
+def test_etag_changes_after_data_changed(client):
+    etag = client.get('/houses_status/').headers['ETag']
+    data_changed('houses')
+
+    response = client.get('/houses_status/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.headers['X-Cache'] == 'MISS'
+
+
+def test_only_the_pages_own_scopes_count(app, client):
+    info_id = add_event().id
+    url = f'/api/v1/events/{info_id}/bracket'
+    etag = client.get(url).headers['ETag']
+
+    data_changed(f'event:{info_id + 1}', 'houses')
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    data_changed(f'event:{info_id}')
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_if_modified_since_is_the_fallback(client):
+    last_modified = client.get('/houses_status/').headers['Last-Modified']
+
+    assert client.get('/houses_status/', headers={'If-Modified-Since': last_modified}).status_code == 304
+    # An ETag, when sent, decides on its own
+    response = client.get('/houses_status/', headers={
+        'If-None-Match': '"stale"', 'If-Modified-Since': last_modified,
+    })
+    assert response.status_code == 200
+
+
+def test_vary_value_is_part_of_the_etag(client):
+    today = client.get('/timetable/').headers['ETag']
+    other_day = client.get('/timetable/?day=2025-03-01').headers['ETag']
+    assert today != other_day
+    assert client.get('/timetable/?day=2025-03-01', headers={'If-None-Match': today}).status_code == 200
+
+
+def test_conditional_view_without_page_cache(client):
+    response = client.get('/autocomplete/players?q=a')
+    assert 'X-Cache' not in response.headers
+
+    etag = response.headers['ETag']
+    assert client.get('/autocomplete/players?q=a', headers={'If-None-Match': etag}).status_code == 304
+    data_changed('players')
+    assert client.get('/autocomplete/players?q=a', headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from email.utils import formatdate
+
+from app import db
+from app.cache import DataVersions, data_versions, house_cache
+from app.models import DataVersion, Houses, Players
+
+
+def other_process():
+    # A second server process: same database, its own in-process state
+    return DataVersions()
+
+
+def test_bump_is_shared_between_processes(app):
+    before = data_versions.get('houses')[0]
+    version = other_process().bump('houses')
+
+    data_versions.forget()
+    assert data_versions.get('houses')[0] == version > before
+    # Unrelated scopes keep their version
+    assert data_versions.get('event:1')[0] == 0
+
+
+def test_page_cached_here_is_refreshed_by_a_write_elsewhere(app, client):
+    assert client.get('/houses_status/').headers['X-Cache'] == 'MISS'
+    assert client.get('/houses_status/').headers['X-Cache'] == 'HIT'
+
+    db.session.get(Houses, 'C6').name = 'Renamed'
+    db.session.commit()
+    other_process().bump('houses')
+
+    response = client.get('/houses_status/')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert 'Renamed' in response.get_data(as_text=True)
+
+
+def test_if_modified_since_uses_the_shared_change_time(app, client):
+    last_modified = client.get('/houses_status/').headers['Last-Modified']
+    assert client.get('/houses_status/', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+    # Changed by another process after the page was served
+    other_process().bump('houses')
+    db.session.get(DataVersion, 'houses').changed_at = datetime.utcnow() + timedelta(seconds=10)
+    db.session.commit()
+
+    assert client.get('/houses_status/', headers={'If-Modified-Since': last_modified}).status_code == 200
+    stale = formatdate(0, usegmt=True)
+    assert client.get('/houses_status/', headers={'If-Modified-Since': stale}).status_code == 200
+
+
+def test_house_cache_follows_shared_version(app):
+    assert house_cache.get('C6').name != 'Renamed'
+
+    db.session.get(Houses, 'C6').name = 'Renamed'
+    db.session.commit()
+    other_process().bump('houses')
+
+    data_versions.forget()
+    assert house_cache.get('C6').name == 'Renamed'
+
+
+def test_player_index_follows_shared_version(app, client):
+    assert client.get('/autocomplete/players?q=zed').get_json() == []
+
+    Players.new('Zed Newcomer', 0, 'A3')
+    db.session.commit()
+    other_process().bump('players')
+
+    assert client.get('/autocomplete/players?q=zed').get_json() == ['Zed Newcomer']
+
+
+def test_own_change_does_not_rebuild_player_index(app, client):
+    from app.search import player_index
+
+    client.get('/autocomplete/players?q=a')
+    player = Players.new('Yara Local', 0, 'A3')
+    db.session.commit()
+    player_index.add(player)
+    data_versions.bump('players')
+
+    assert player_index.current
+    assert client.get('/autocomplete/players?q=yara').get_json() == ['Yara Local']
@@ -0,0 +1,73 @@
+import pytest
+
+from app import db
+from app.cache import FragmentCache, data_changed, fragment_cache
+from app.models import Players
+from app.utils import apply_match_results, create_matches_from_names, load_bracket
+from conftest import add_event, add_players
+
+NAMES = [f'P{i}' for i in range(8)]
+
+
+@pytest.fixture
+def event_id(app):
+    add_players(NAMES)
+    info_id = add_event().id
+    create_matches_from_names(NAMES, info_id)
+    fragment_cache.clear()
+    return info_id
+
+
+def render(client, info_id):
+    # Hits and misses of the fragment cache for one view of the results grid
+    before = fragment_cache.stats()
+    page = client.get(f'/your-secret-key/management/matches/all/{info_id}/batch/').get_data(as_text=True)
+    after = fragment_cache.stats()
+    return page, after['hits'] - before['hits'], after['misses'] - before['misses']
+
+
+def test_results_grid_reuses_unchanged_rounds(event_id, client):
+    assert render(client, event_id)[1:] == (0, 3)
+    assert render(client, event_id)[1:] == (3, 0)
+
+    # A quarter-final result changes its round and the semi-final it feeds
+    match = load_bracket(event_id)[0][0]
+    apply_match_results(event_id, [{'match_id': match.id, 'score1': 7, 'score2': 0, 'winner': match.player1_id}])
+    db.session.commit()
+
+    page, hits, misses = render(client, event_id)
+    assert (hits, misses) == (1, 2)
+    assert f'name="score1-{match.id}" value="7"' in page
+
+
+def test_renamed_player_renders_again(event_id, client):
+    render(client, event_id)
+    db.session.scalar(db.select(Players).where(Players.name == 'P0')).name = 'Renamed'
+    db.session.commit()
+    data_changed('players')
+
+    page, hits, misses = render(client, event_id)
+    assert (hits, misses) == (0, 3)
+    assert 'Renamed' in page
+
+
+def test_whole_page_cached_pages_use_no_fragments(client):
+    before = fragment_cache.stats()
+    client.get('/houses_status/')
+    data_changed('houses')
+    client.get('/houses_status/')
+    after = fragment_cache.stats()
+    assert (after['hits'], after['misses']) == (before['hits'], before['misses'])
+
+
+def test_fragments_are_bounded_by_size():
+    cache = FragmentCache(max_bytes=10)
+    cache.set('a', '12345')
+    cache.set('b', '12345')
+    cache.get('a')
+    cache.set('c', '123')
+    # The least recently used entry makes room
+    assert cache.get('b') is None and cache.get('a') == '12345'
+    cache.set('huge', 'x' * 11)
+    assert cache.get('huge') is None
+    assert cache.stats()['bytes'] <= 10
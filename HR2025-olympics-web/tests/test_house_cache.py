@@ -0,0 +1,79 @@
+from app import db
+from app.cache import data_changed, house_cache
+from app.models import Houses, Players, ScoringRule
+from app.utils import placement_awards
+
+from conftest import add_event
+
+
+def rename(house_id, name):
+    db.session.get(Houses, house_id).name = name
+    db.session.commit()
+
+
+def test_lookups_share_one_query(app, count_queries):
+    house_cache.invalidate()
+
+    with count_queries() as statements:
+        c6 = house_cache.get('C6')
+        house_cache.get('A3')
+        ids = house_cache.ids()
+        choices = house_cache.choices()
+        house_cache.all()
+    assert len([s for s in statements if 'FROM houses' in s]) == 1
+
+    assert (c6.id, c6.multiplier) == ('C6', 1.0)
+    assert len(ids) == 12 and house_cache.get('ZZ') is None
+    assert choices == sorted(choices)
+
+
+def test_refreshed_by_data_changed_only(app):
+    before = house_cache.get('C6').name
+    rename('C6', 'Renamed')
+    # Writes that do not bump the version are not seen
+    assert house_cache.get('C6').name == before
+
+    data_changed('houses')
+    assert house_cache.get('C6').name == 'Renamed'
+
+
+def test_invalidate_forces_a_reload(app):
+    house_cache.get('C6')
+    rename('C6', 'Renamed')
+
+    house_cache.invalidate()
+    assert house_cache.get('C6').name == 'Renamed'
+
+
+def test_empty_table_is_not_cached(app):
+    house_cache.invalidate()
+    db.session.execute(db.delete(Houses))
+    assert house_cache.get('A3') is None
+
+    db.session.rollback()
+    assert house_cache.get('A3').id == 'A3'
+
+
+def test_players_read_their_house_from_the_cache(app, count_queries):
+    player = Players.new('Cached', 0, 'B4')
+    db.session.commit()
+    house_id = player.house_id1
+    house_cache.get(house_id)
+
+    with count_queries() as statements:
+        house = Players.house_from_id(house_id)
+    assert house.id == 'B4' and statements == []
+
+
+def test_saved_multiplier_applies_to_the_next_award(app, client):
+    form = {f'points-{rule.category}-{rule.placement}': rule.points for rule in ScoringRule.query}
+    form.update({f'multiplier-{house.id}': 1 for house in Houses.query})
+    form['multiplier-B4'] = 2
+    assert house_cache.get('B4').multiplier == 1.0
+
+    assert client.post('/your-secret-key/management/scoring/', data=form).status_code == 200
+
+    winner = Players.new('Doubled', 0, 'B4')
+    awards = placement_awards(add_event('Chess', 'Individual'), [winner])
+    assert house_cache.get('B4').multiplier == 2.0
+    assert awards == [('B4', 50, 1)]
@@ -0,0 +1,82 @@
+import io
+
+import pytest
+
+from app import db
+from app.models import Players
+from app.utils import import_players_csv
+
+
+def run(text, **options):
+    return import_players_csv(io.StringIO(text), **options)
+
+
+def player(name):
+    return db.session.scalar(db.select(Players).where(Players.name == name))
+
+
+def test_valid_rows_are_imported(app):
+    report = run("name,house,house2,medals\nAda,a3,,2\nBo,C4,b5,\n\nCy,F0,,0\n", batch_size=2)
+
+    assert report == {'imported': 3, 'skipped': 0, 'errors': [], 'error_count': 0}
+    ada, bo = player('Ada'), player('Bo')
+    assert (ada.house_id1, ada.house_id2, ada.medals) == ('A3', None, 2)
+    assert (bo.house_id1, bo.house_id2, bo.medals) == ('C4', 'B5', 0)
+
+
+def test_bad_house_ids_are_reported_by_line(app):
+    report = run("name,house,house2\nAda,ZZ,\nBo,A3,Q1\nCy,A3,\n")
+
+    assert report['imported'] == 1
+    assert report['errors'] == [(2, "Unknown house 'ZZ'."), (3, "Unknown second house 'Q1'.")]
+    assert player('Ada') is None
+
+
+def test_over_long_name_is_rejected(app):
+    longest = 'x' * Players.NAME_LENGTH
+    report = run(f"name,house\n{longest},A3\n{longest}y,A3\n")
+
+    assert report['imported'] == 1
+    assert report['errors'] == [(3, f"Name longer than {Players.NAME_LENGTH} characters.")]
+
+
+def test_duplicates_are_skipped(app):
+    Players.new('Ada', 0, 'A3')
+    db.session.commit()
+
+    report = run("name,house\nAda,B3\nBo,B3\nBo,C3\n")
+
+    assert (report['imported'], report['skipped']) == (1, 2)
+    assert player('Ada').house_id1 == 'A3'
+    assert Players.query.filter_by(name='Bo').one().house_id1 == 'B3'
+
+
+def test_errors_beyond_the_limit_are_only_counted(app):
+    report = run("name,house\n" + "Ada,ZZ\n" * 5, max_errors=2)
+    assert len(report['errors']) == 2 and report['error_count'] == 5
+
+
+@pytest.mark.parametrize('text, message', [
+    ('', 'The file is empty.'),
+    ('name,medals\nAda,1\n', "The header needs a 'name' and a 'house' column."),
+])
+def test_unusable_header_stops_the_import(app, text, message):
+    with pytest.raises(ValueError, match=message):
+        run(text)
+
+
+def test_header_aliases_and_extra_columns(app):
+    report = run(" Name ,Notes,HOUSE_ID1\nAda,ignored,a4\n")
+    assert report['imported'] == 1
+    assert player('Ada').house_id1 == 'A4'
+
+
+def test_upload_reports_through_the_page(client):
+    response = client.post('/your-secret-key/management/players/import/', data={
+        # Spreadsheet exports start with a byte order mark
+        'file': (io.BytesIO('\ufeffname,house\nAda,A3\nBo,ZZ\n'.encode()), 'players.csv'),
+    })
+
+    assert response.status_code == 200
+    assert player('Ada') is not None
+    assert "Unknown house &#39;ZZ&#39;." in response.get_data(as_text=True)
@@ -0,0 +1,74 @@
+import time
+from datetime import timedelta
+
+from app import db
+from app.live import LiveBroker, event_channel
+from app.models import LiveEvent
+
+
+def broker(**options):
+    options = {'heartbeat': 0.05, 'max_age': 0.3, 'poll': 0.01, **options}
+    return LiveBroker(**options)
+
+
+def test_stream_closes_after_max_age(app):
+    started = time.monotonic()
+    chunks = list(broker().stream('houses'))
+
+    assert chunks[0].startswith('retry:')
+    assert ': keep-alive\n\n' in chunks
+    assert time.monotonic() - started < 1
+
+
+def test_stream_delivers_messages_published_elsewhere(app):
+    stream = broker(max_age=1).stream('event:1')
+    next(stream)  # retry line; older messages are not replayed
+    # Published by another process: only the shared table connects them
+    event_id = LiveBroker().publish('event:1', 'matches', [{'id': 1}])
+    LiveBroker().publish('event:2', 'matches', [{'id': 2}])
+
+    assert next(stream) == f'id: {event_id}\nevent: matches\ndata: [{{"id":1}}]\n\n'
+    stream.close()
+
+
+def test_reconnect_replays_missed_messages(app):
+    live = broker()
+    seen = live.publish('houses', 'standings', [1])
+    missed = [live.publish('houses', 'standings', [2]), live.publish('houses', 'standings', [3])]
+
+    chunks = [chunk for chunk in live.stream('houses', last_event_id=str(seen)) if chunk.startswith('id:')]
+    assert [int(chunk.split('\n')[0][4:]) for chunk in chunks] == missed
+
+
+def test_resume_from_ignores_unusable_ids():
+    assert LiveBroker.resume_from(None, 7) == 7
+    assert LiveBroker.resume_from('abc', 7) == 7
+    assert LiveBroker.resume_from('3', 7) == 3
+    # From before the table was emptied
+    assert LiveBroker.resume_from('99', 7) == 7
+
+
+def test_publish_prunes_old_messages(app):
+    live = broker(retention=60)
+    old = live.publish('houses', 'standings', [1])
+    db.session.get(LiveEvent, old).created_at -= timedelta(seconds=120)
+    db.session.commit()
+
+    live.publish('houses', 'standings', [2])
+    assert db.session.get(LiveEvent, old) is None
+    assert LiveEvent.query.count() == 1
+
+
+def test_live_route_replays_from_last_event_id(app, client):
+    app.config['LIVE_STREAM_MAX_SECONDS'] = 0.2
+    from app.live import live
+    live.init_app(app)
+    seen = live.publish(event_channel(5), 'matches', [])
+    missed = live.publish(event_channel(5), 'podium', {'places': ['A', 'B', 'C']})
+
+    response = client.get('/live/5', headers={'Last-Event-ID': str(seen)})
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert body.startswith('retry:')
+    assert f'id: {missed}\nevent: podium' in body
+    assert f'id: {seen}\n' not in body
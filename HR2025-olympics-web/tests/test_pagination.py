@@ -0,0 +1,39 @@
+import base64
+import json
+
+import pytest
+
+from app import db
+from app.models import Players
+from app.utils import keyset_page
+
+from conftest import add_players
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def test_pages_follow_each_other(app):
+    add_players([f'Player {i:02}' for i in range(7)])
+    columns = [Players.name, Players.id]
+
+    seen, after = [], None
+    while True:
+        rows, after = keyset_page(db.select(Players), columns, after, limit=3)
+        seen += [row.name for row in rows]
+        if after is None:
+            break
+
+    assert seen == sorted(db.session.scalars(db.select(Players.name)))
+
+
+@pytest.mark.parametrize('values', [[{'a': 1}, 2], ['A3', '2'], ['A3', True], [['x'], 1], 'A3'])
+def test_forged_cursor_is_rejected(app, values):
+    with pytest.raises(ValueError):
+        keyset_page(db.select(Players), [Players.name, Players.id], cursor(values))
+
+
+def test_forged_cursor_redirects(app, client):
+    response = client.get('/your-secret-key/management/players/', query_string={'cursor': cursor([{'a': 1}, 2])})
+    assert response.status_code == 302
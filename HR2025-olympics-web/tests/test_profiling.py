@@ -0,0 +1,15 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+
+
+def test_failed_statement_does_not_leak_start_times():
+    app = create_app({'SLOW_QUERY_MS': 10000}, env='testing')
+    with app.app_context():
+        with db.engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.exec_driver_sql('SELECT * FROM no_such_table')
+            conn.exec_driver_sql('SELECT 1')
+            assert conn.connection.info.get('query_start') == []
@@ -0,0 +1,65 @@
+from app import db
+from app.models import Players
+from app.utils import apply_match_results, create_matches_from_names, event_progress, load_bracket
+from conftest import add_event, add_players
+
+NAMES = ['P1', 'P2', 'P3', 'P4']
+
+
+def bracket_event(name='Chess'):
+    info_id = add_event(name).id
+    create_matches_from_names(NAMES, info_id)
+    return info_id
+
+
+def decide(info_id, match):
+    apply_match_results(info_id, [{'match_id': match.id, 'score1': 1, 'score2': 0, 'winner': match.player1_id}])
+    db.session.commit()
+
+
+def test_rounds_count_decided_matches(app):
+    add_players(NAMES)
+    info_id = bracket_event()
+    assert event_progress([info_id]) == {info_id: {'winner': None, 'rounds': [(1, 0, 2), (2, 0, 1)]}}
+
+    decide(info_id, load_bracket(info_id)[0][0])
+    assert event_progress([info_id])[info_id]['rounds'] == [(1, 1, 2), (2, 0, 1)]
+
+
+def test_winner_and_events_without_bracket(app):
+    add_players(NAMES)
+    plain = add_event('Quiz')
+    plain.manual_1st_player_id = db.session.scalar(db.select(Players.id).where(Players.name == 'P3'))
+    db.session.commit()
+
+    progress = event_progress([plain.id, 999999])
+    assert progress == {plain.id: {'winner': 'P3', 'rounds': []}}
+    assert event_progress([]) == {}
+
+
+def test_one_query_for_any_number_of_events(app, count_queries):
+    add_players(NAMES)
+    info_ids = [bracket_event(f'Event {i}') for i in range(5)] + [add_event('Quiz').id]
+
+    with count_queries() as statements:
+        progress = event_progress(info_ids)
+    assert len(statements) == 1
+    assert len(progress) == 6
+
+
+def test_management_list_shows_the_progress_column(app, client):
+    add_players(NAMES)
+    info_id = bracket_event()
+    add_event('Quiz')
+    semi = load_bracket(info_id)[0][0]
+    decide(info_id, semi)
+
+    page = client.get('/your-secret-key/management/matches/all/').get_data(as_text=True)
+    assert '<th>Progress</th>' in page
+    assert '<div class="round-pending">R1: 1/2 decided</div>' in page
+    assert '<div class="round-pending">R2: 0/1 decided</div>' in page
+    assert 'No bracket' in page
+
+    decide(info_id, load_bracket(info_id)[0][1])
+    page = client.get('/your-secret-key/management/matches/all/').get_data(as_text=True)
+    assert '<div class="round-done">R1: 2/2 decided</div>' in page
@@ -0,0 +1,84 @@
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.utils import create_matches_from_names, load_bracket
+from conftest import add_event, add_players
+
+# Tables small enough that a scan is the right plan
+SMALL_TABLES = {'houses', 'house_standings'}
+SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+KEY = 'your-secret-key'
+NAMES = [f'P{i}' for i in range(12)]
+
+
+@pytest.fixture
+def event_id(app):
+    add_players(NAMES)
+    info_id = add_event().id
+    add_event('Football', 'Team', status=0)
+    create_matches_from_names(NAMES[:8], info_id)
+    return info_id
+
+
+def requests(info_id, match):
+    # The busiest routes and management writes
+    return [
+        ('GET', '/', None),
+        ('GET', '/timetable/', None),
+        ('GET', '/houses_status/', None),
+        ('GET', f'/{info_id}/', None),
+        ('GET', f'/{KEY}/management/{info_id}/', None),
+        ('GET', f'/{KEY}/management/matches/all/', None),
+        ('GET', f'/{KEY}/management/matches/all/{info_id}/', None),
+        ('GET', f'/{KEY}/management/players/', None),
+        ('GET', f'/api/v1/events/{info_id}/bracket', None),
+        ('GET', '/api/v1/events?status=1', None),
+        ('GET', '/api/v1/players?house=A3', None),
+        ('POST', f'/{KEY}/management/matches/all/{info_id}/{match.id}/',
+         {'score1': 2, 'score2': 1, 'winner': match.player1_id}),
+        ('POST', f'/{KEY}/management/matches/all/{info_id}/win/',
+         {'first_place': NAMES[0], 'second_place': NAMES[1], 'third_place': NAMES[2]}),
+        ('POST', f'/{KEY}/management/matches/create/{info_id}/', {'participant_names': ', '.join(NAMES)}),
+    ]
+
+
+def capture(client, method, url, data):
+    # The distinct filtering or sorting statements a request issues, with parameters
+    statements = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        upper = statement.lstrip().upper()
+        if not executemany and upper.startswith(('SELECT', 'UPDATE', 'DELETE')) \
+                and (' WHERE ' in upper or ' ORDER BY ' in upper):
+            statements.setdefault(statement, parameters)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.open(url, method=method, data=data)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code < 400, url
+    return statements
+
+
+def full_scans(statements):
+    connection = db.session.connection().connection.driver_connection
+    return [
+        (row[-1], ' '.join(statement.split()))
+        for statement, parameters in statements.items()
+        for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+        if (scan := SCAN.match(row[-1])) and scan.group(1) not in SMALL_TABLES
+    ]
+
+
+def test_hot_queries_use_indexes(event_id, client):
+    match = load_bracket(event_id)[0][0]
+    checked = 0
+    for method, url, data in requests(event_id, match):
+        statements = capture(client, method, url, data)
+        checked += len(statements)
+        assert full_scans(statements) == [], f"{method} {url}"
+    assert checked > 20
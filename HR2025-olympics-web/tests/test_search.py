@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+from app.search import PlayerNameIndex
+
+
+def player(id_, name, house='A3'):
+    return SimpleNamespace(id=id_, name=name, house_id1=house, house_id2=None)
+
+
+def test_rebuild_replaces_previous_names():
+    index = PlayerNameIndex()
+    index.build([player(1, 'Alice'), player(2, 'Alan')])
+    assert index.search('al', limit=5) == ['Alan', 'Alice']
+
+    # Rebuilt from a table where Alan was deleted and Albert added
+    index.build([player(1, 'Alice'), player(3, 'Albert')])
+    # limit equal to the number of prefix matches: answered from the sorted list
+    assert index.search('al', limit=2) == ['Albert', 'Alice']
+    assert index.search('alan') == []
+
+
+def test_rebuild_does_not_duplicate_prefix_matches():
+    index = PlayerNameIndex()
+    players = [player(i, f'Bob {i}') for i in range(3)]
+    index.build(players)
+    index.build(players)
+
+    assert index.search('bob', limit=3) == ['Bob 0', 'Bob 1', 'Bob 2']
@@ -0,0 +1,164 @@
+import pytest
+
+from app import db
+from app.models import Houses, HousePointsLedger, HouseStandings, Players, ScoringRule
+from app.utils import (
+    award_house_points, house_standings, placement_awards, rebuild_standings, recompute_standings,
+)
+
+from conftest import add_event
+
+
+def points(house_id):
+    return db.session.get(HouseStandings, house_id).points
+
+
+def test_award_creates_missing_standings_row(app):
+    db.session.delete(db.session.get(HouseStandings, 'C4'))
+    db.session.commit()
+
+    award_house_points([('C4', 25, 1), ('A3', 20, 2)], match_info_id=None)
+    db.session.commit()
+
+    assert points('C4') == 25
+    assert points('A3') == 20
+    assert [row['id'] for row in house_standings()][:2] == ['C4', 'A3']
+
+
+def test_award_to_unknown_house_raises(app):
+    with pytest.raises(ValueError):
+        award_house_points([('ZZ', 25, 1)])
+
+
+def test_house_standings_does_not_write(app, count_queries):
+    HouseStandings.query.delete()
+    db.session.get(Houses, 'B3').points = 7
+    db.session.commit()
+
+    with count_queries() as statements:
+        rows = house_standings()
+    assert all(statement.lstrip().upper().startswith('SELECT') for statement in statements)
+    assert rows[0]['id'] == 'B3' and rows[0]['rank'] == 1
+    assert HouseStandings.query.count() == 0
+
+
+def legacy_event(name, category, podium):
+    # An event won before the ledger existed: manual places and the points
+    # the old winners form added straight to Houses.points
+    info = add_event(name, category)
+    info.manual_1st_player_id, info.manual_2nd_player_id, info.manual_3rd_player_id = (
+        player.id for player in podium
+    )
+    for player, points in zip(podium, ScoringRule.DEFAULT_POINTS[category]):
+        db.session.get(Houses, player.house_id1).points += points
+    return info
+
+
+@pytest.fixture
+def migrated(app):
+    # The state the ledger migration leaves: opening entries with the old totals
+    players = [Players.new(f'{house} player', 0, house) for house in ('C4', 'A3', 'B3', 'C4')]
+    HousePointsLedger.query.delete()
+    HouseStandings.query.delete()
+    db.session.flush()
+    legacy_event('Football', 'Team', players[:3])
+    chess = legacy_event('Chess', 'Individual', [players[3], players[1], players[2]])
+    rebuild_standings()
+    db.session.commit()
+    return chess
+
+
+def test_recompute_keeps_migrated_totals(migrated):
+    before = {row['id']: row['points'] for row in house_standings()}
+    assert before['C4'] == 75
+
+    recompute_standings()
+    db.session.commit()
+
+    assert {row['id']: row['points'] for row in house_standings()} == before
+    assert HousePointsLedger.query.filter(HousePointsLedger.placement.isnot(None)).count() == 6
+
+    # Settled once: a second recompute changes nothing either
+    recompute_standings()
+    db.session.commit()
+    assert {row['id']: row['points'] for row in house_standings()} == before
+
+
+def test_recompute_applies_new_rules_to_migrated_events(migrated):
+    db.session.get(ScoringRule, ('Individual', 1)).points = 30
+    recompute_standings()
+    db.session.commit()
+
+    assert points('C4') == 80
+
+
+def test_saving_migrated_winners_again_counts_once(migrated):
+    chess = migrated
+    podium = [db.session.get(Players, chess.manual_1st_player_id)]
+    award_house_points(placement_awards(chess, podium), match_info_id=chess.id, replace=True)
+    db.session.commit()
+
+    assert points('C4') == 75
+    assert points('A3') == 45
+    rebuild_standings()
+    assert points('C4') == 75 and points('A3') == 45
+
+
+def test_deleting_event_withdraws_its_points(app, client):
+    player = Players.new('Deleted winner', 0, 'B5')
+    chess = add_event('Chess', 'Individual')
+    award_house_points(placement_awards(chess, [player]), match_info_id=chess.id)
+    db.session.commit()
+    before = points('B5')
+
+    response = client.post(f'/your-secret-key/management/matches/edit/{chess.id}/', data={'delete': '1'})
+    assert response.status_code == 302
+
+    db.session.expire_all()
+    assert points('B5') == before - 25
+    assert HousePointsLedger.query.filter_by(match_info_id=chess.id).count() == 0
+    assert {row['id']: row['points'] for row in house_standings()}['B5'] == before - 25
+
+
+def test_deleting_migrated_event_withdraws_its_points(migrated, client):
+    chess = migrated
+
+    client.post(f'/your-secret-key/management/matches/edit/{chess.id}/', data={'delete': '1'})
+
+    db.session.expire_all()
+    # Chess gave C4 25, A3 20 and B3 15; the Football points stay
+    assert (points('C4'), points('A3'), points('B3')) == (50, 45, 40)
+    assert HousePointsLedger.query.filter_by(match_info_id=chess.id).count() == 0
+    rebuild_standings()
+    assert (points('C4'), points('A3'), points('B3')) == (50, 45, 40)
+
+
+def save_winners(client, info, names):
+    return client.post(f'/your-secret-key/management/matches/all/{info.id}/win/', data=dict(
+        zip(('first_place', 'second_place', 'third_place'), names)
+    ))
+
+
+def test_saving_winners_commits_places_with_points(app, client):
+    podium = [Players.new(name, 0, house) for name, house in (('W1', 'C3'), ('W2', 'C5'), ('W3', 'C6'))]
+    chess = add_event('Chess', 'Individual')
+
+    assert save_winners(client, chess, [p.name for p in podium]).status_code == 302
+
+    db.session.expire_all()
+    assert chess.manual_1st_player_id == podium[0].id
+    assert HousePointsLedger.query.filter_by(match_info_id=chess.id).count() == 3
+
+
+def test_saving_winners_of_unscored_event_saves_nothing(app, client):
+    podium = [Players.new(name, 0, 'C3') for name in ('W1', 'W2', 'W3')]
+    quiz = add_event('Quiz', 'Trivia')
+    before = points('C3')
+
+    response = save_winners(client, quiz, [p.name for p in podium])
+    assert response.headers['Location'].endswith(f'/matches/all/{quiz.id}/win/')
+
+    db.session.expire_all()
+    assert quiz.manual_1st_player_id is None
+    assert HousePointsLedger.query.filter_by(match_info_id=quiz.id).count() == 0
+    assert points('C3') == before
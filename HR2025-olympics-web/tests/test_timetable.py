@@ -0,0 +1,29 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.routes import _timetable_vary
+from app.utils import TIMETABLE_MAX_HOURS, timetable_range
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('', date.today().isoformat()),
+    ('?day=', date.today().isoformat()),
+    ('?day=today', date.today().isoformat()),
+    ('?day=not-a-date', date.today().isoformat()),
+    ('?day=2025-03-01', ''),
+])
+def test_vary_follows_the_date_unless_a_day_is_given(app, query, expected):
+    with app.test_request_context(f'/timetable/{query}'):
+        assert _timetable_vary() == expected
+
+
+@pytest.mark.parametrize('hours, expected', [(6, 6), (-5, 1), (99999999999, TIMETABLE_MAX_HOURS)])
+def test_hours_window_is_clamped(hours, expected):
+    now = datetime(2025, 3, 1, 12)
+    start, end, selected_day = timetable_range([], '', hours, now)
+    assert (start, end, selected_day) == (now, now + timedelta(hours=expected), None)
+
+
+def test_huge_hours_argument_is_served(client):
+    assert client.get('/timetable/?hours=99999999999').status_code == 200